@@ -1,5 +1,6 @@
 from django.contrib import admin
 
-from .models import Article
+from .models import Article, ArchivedArticle
 
-admin.site.register(Article)
\ No newline at end of file
+admin.site.register(Article)
+admin.site.register(ArchivedArticle)
\ No newline at end of file
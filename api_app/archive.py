@@ -0,0 +1,73 @@
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Article, ArchivedArticle, ArticleEvent
+from . import caching
+
+DEFAULT_ARCHIVE_AFTER_DAYS = 365
+DEFAULT_BATCH_SIZE = 1000
+
+
+def get_cutoff(days=None):
+    if days is None:
+        days = getattr(
+            settings, "ARTICLE_ARCHIVE_AFTER_DAYS", DEFAULT_ARCHIVE_AFTER_DAYS
+        )
+    return timezone.now() - timezone.timedelta(days=days)
+
+
+def rollable(cutoff):
+    """
+        Articles published before cutoff,
+        articles waiting for moderation stay in the hot table.
+    """
+    return (
+        Article.objects
+        .filter(pub_date__lt=cutoff)
+        .exclude(is_active=False, rejected_at__isnull=True)
+        .order_by("pub_date", "id")
+    )
+
+
+def roll_batch(cutoff, batch_size=DEFAULT_BATCH_SIZE) -> int:
+    """
+        Move one batch of old articles to the archive table,
+        this function return the number of moved articles.
+    """
+    with transaction.atomic():
+        articles = list(rollable(cutoff).select_for_update()[:batch_size])
+        if not articles:
+            return 0
+
+        ArchivedArticle.objects.bulk_create(
+            [
+                ArchivedArticle(
+                    id=article.id,
+                    title=article.title,
+                    json_body=article.json_body,
+                    pub_date=article.pub_date,
+                    is_active=article.is_active,
+                    slug=article.slug,
+                    user_id=article.user_id,
+                )
+                for article in articles
+            ]
+        )
+        ArticleEvent.objects.bulk_create(
+            [
+                ArticleEvent(
+                    article_id=article.pk,
+                    slug=article.slug,
+                    user_id=article.user_id,
+                    kind=ArticleEvent.Kind.ARCHIVED,
+                )
+                for article in articles
+            ]
+        )
+        Article.objects.filter(id__in=[article.id for article in articles]).delete()
+
+        for user_id in {article.user_id for article in articles}:
+            caching.invalidate_user(user_id)
+
+    return len(articles)
@@ -0,0 +1,218 @@
+import json
+import os
+import time
+from datetime import datetime
+
+from django.contrib.auth.models import User
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .models import Article, ArchivedArticle, ArticleEvent
+from .serializers import ArticleSerializer
+from . import caching
+
+
+class ExportEncoder(DjangoJSONEncoder):
+    """
+        DjangoJSONEncoder cuts datetimes to milliseconds,
+        keep microseconds so pub_date and the slug survive a round trip.
+    """
+
+    def default(self, o):
+        if isinstance(o, datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+EXPORT_FIELDS = ["id", "title", "json_body", "pub_date", "is_active", "slug", "user"]
+
+
+def read_chunks(stream, batch_size, skip=0):
+    """
+        Yield lists of ( line number, line ) from an NDJSON stream,
+        the first skip lines are already imported.
+    """
+    chunk = []
+    for line_no, line in enumerate(stream, 1):
+        if line_no <= skip or not line.strip():
+            continue
+        chunk.append((line_no, line))
+        if len(chunk) == batch_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def validate_chunk(chunk) -> tuple:
+    """
+        Parse and validate lines by ArticleSerializer, it runs in the worker
+        processes, so it does not touch the database.
+        this function return ( rows, errors, last line number ).
+    """
+    rows, errors = [], []
+    for line_no, line in chunk:
+        try:
+            record = json.loads(line)
+        except ValueError as exc:
+            errors.append((line_no, str(exc)))
+            continue
+        if not isinstance(record, dict):
+            errors.append((line_no, "Line is not a json object."))
+            continue
+        # the slug is made from title and pub_date, without pub_date
+        # every import would make a new slug and duplicate the article.
+        if "pub_date" not in record:
+            errors.append((line_no, "pub_date is required."))
+            continue
+        user_id = record.get("user")
+        if user_id is not None and (
+            type(user_id) is not int or user_id < 1
+        ):
+            errors.append((line_no, "user should be a positive integer."))
+            continue
+        article_id = record.get("id")
+        if article_id is not None and (
+            type(article_id) is not int or article_id < 1
+        ):
+            errors.append((line_no, "id should be a positive integer."))
+            continue
+
+        serializer = ArticleSerializer(data=record)
+        if not serializer.is_valid():
+            errors.append((line_no, json.dumps(serializer.errors)))
+            continue
+        rows.append((line_no, {
+            **serializer.validated_data,
+            "is_active": record.get("is_active") is True,
+            "user_id": user_id,
+            "id": article_id,
+        }))
+    return (rows, errors, chunk[-1][0])
+
+
+def write_rows(rows, default_user_id=None, archived=False) -> tuple:
+    """
+        bulk_create validated rows with precomputed slugs in the hot table,
+        or with archived in the archive table, which keeps the exported ids.
+        Slugs that are already in either table are skipped, so a batch can
+        be written again after a crash or after roll_articles.
+        A CREATED outbox event is written for every inserted article.
+        this function return ( inserted count, errors ),
+        call it in a transaction, so the count is not changed by other writers.
+    """
+    model = ArchivedArticle if archived else Article
+    user_ids = {data["user_id"] or default_user_id for _, data in rows}
+    existing = set(User.objects.filter(id__in=user_ids).values_list("id", flat=True))
+
+    articles, errors = [], []
+    for line_no, data in rows:
+        user_id = data.pop("user_id") or default_user_id
+        article_id = data.pop("id")
+        if user_id not in existing:
+            errors.append((line_no, f"User {user_id} does not exist."))
+            continue
+        if archived and article_id is None:
+            errors.append((line_no, "id is required for the archive."))
+            continue
+        article = model(user_id=user_id, **data)
+        article.slug = Article.make_slug(article)
+        if archived:
+            article.id = article_id
+        articles.append((line_no, article))
+
+    slugs = [article.slug for _, article in articles]
+    skip = set(
+        Article.objects.filter(slug__in=slugs).values_list("slug", flat=True)
+    ) | set(
+        ArchivedArticle.objects.filter(slug__in=slugs).values_list("slug", flat=True)
+    )
+    if archived:
+        # archived ids come from the hot table, they should not collide with it.
+        used_ids = set(
+            Article.objects.filter(
+                id__in=[article.id for _, article in articles]
+            ).values_list("id", flat=True)
+        )
+        for line_no, article in articles:
+            if article.id in used_ids and article.slug not in skip:
+                errors.append((line_no, f"id {article.id} is used by an article."))
+                skip.add(article.slug)
+
+    new = {}
+    for _, article in articles:
+        if article.slug not in skip:
+            new.setdefault(article.slug, article)
+
+    # ignore_conflicts keeps a concurrent import of the same slugs from failing,
+    # the inserted rows are read back for their ids.
+    model.objects.bulk_create(new.values(), ignore_conflicts=True)
+    inserted = list(
+        model.objects.filter(slug__in=list(new)).values_list("id", "slug", "user_id")
+    )
+    ArticleEvent.objects.bulk_create(
+        [
+            ArticleEvent(
+                article_id=article_id,
+                slug=slug,
+                user_id=user_id,
+                kind=ArticleEvent.Kind.CREATED,
+            )
+            for article_id, slug, user_id in inserted
+        ]
+    )
+
+    for user_id in {user_id for _, _, user_id in inserted}:
+        caching.invalidate_user(user_id)
+    return (len(inserted), errors)
+
+
+def export_lines(queryset, after_id=0, chunk_size=2000):
+    """
+        Yield ( id, NDJSON line ) in id order, .iterator() uses a server side
+        cursor where the database has one.
+    """
+    queryset = (
+        queryset.filter(id__gt=after_id)
+        .order_by("id")
+        .values(*EXPORT_FIELDS)
+    )
+    for row in queryset.iterator(chunk_size=chunk_size):
+        yield (row["id"], json.dumps(row, cls=ExportEncoder) + "\n")
+
+
+def load_checkpoint(path, key) -> int:
+    if not path or not os.path.exists(path):
+        return 0
+    with open(path) as f:
+        return json.load(f).get(key, 0)
+
+
+def save_checkpoint(path, key, value):
+    if not path:
+        return
+    with open(f"{path}.tmp", "w") as f:
+        json.dump({key: value}, f)
+    os.replace(f"{path}.tmp", path)
+
+
+class Progress:
+    def __init__(self, stream, label, every=1):
+        self.stream = stream
+        self.label = label
+        self.every = every
+        self.rows = 0
+        self.reports = 0
+        self.started = time.monotonic()
+
+    @property
+    def rate(self):
+        return self.rows / max(time.monotonic() - self.started, 1e-9)
+
+    def add(self, rows):
+        self.rows += rows
+        self.reports += 1
+        if self.reports % self.every == 0:
+            self.write()
+
+    def write(self):
+        self.stream.write(f"{self.label}: {self.rows} rows, {self.rate:.0f} rows/s")
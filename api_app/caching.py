@@ -0,0 +1,69 @@
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+DEFAULT_TIMEOUT = 60
+
+
+def version_key(user_id) -> str:
+    return f"user-articles-version:{user_id}"
+
+
+def get_version(user_id):
+    """
+        A missing version gets a new unique value instead of starting from 1,
+        so entries cached under an evicted version are never read again.
+    """
+    return cache.get_or_set(version_key(user_id), time.time_ns, None)
+
+
+def bump_version(user_id):
+    """
+        Invalidate every cached article list of user.
+    """
+    try:
+        cache.incr(version_key(user_id))
+    except ValueError:
+        cache.set(version_key(user_id), time.time_ns(), None)
+
+
+def invalidate_user(user_id):
+    """
+        Bump now and again after commit, so a list cached by a concurrent
+        request before the transaction is committed is not served.
+    """
+    bump_version(user_id)
+    transaction.on_commit(lambda: bump_version(user_id))
+
+
+def list_key(user_id, params) -> str:
+    """
+        Only the params that change the list are in the key,
+        other query params do not make new cache entries.
+    """
+    # models imports this module.
+    from .models import JSON_BODY_FILTER_KEYS
+
+    query = urlencode(
+        sorted(
+            (key, values) for key, values in params.lists()
+            if key in JSON_BODY_FILTER_KEYS or key == "archived"
+        ),
+        doseq=True,
+    )
+    return f"user-articles:{user_id}:{get_version(user_id)}:{query}"
+
+
+def get_or_set_list(user_id, params, default):
+    """
+        Cached serialized article list of user,
+        default is called to build it when it is not cached.
+    """
+    return cache.get_or_set(
+        list_key(user_id, params),
+        default,
+        getattr(settings, "USER_ARTICLES_CACHE_TIMEOUT", DEFAULT_TIMEOUT),
+    )
@@ -0,0 +1,129 @@
+import threading
+from concurrent.futures import Future
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.http import HttpResponse
+from rest_framework.exceptions import NotAcceptable
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+
+class SingleFlight:
+    """
+        Run only one call per key at a time,
+        concurrent callers with the same key wait and share its result.
+        Under ASGI sync views run in their own thread per request,
+        so the same lock covers both the sync and the ASGI path.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.requests = 0
+        self.executions = 0
+
+    def do(self, key, fn) -> tuple:
+        """
+            this function return ( result, shared ),
+            shared is True when the result came from another caller.
+        """
+        with self._lock:
+            self.requests += 1
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+                self.executions += 1
+
+        if not leader:
+            return (future.result(), True)
+
+        try:
+            result = fn()
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(result)
+            return (result, False)
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+    def stats(self) -> dict:
+        with self._lock:
+            requests, executions = self.requests, self.executions
+        shared = requests - executions
+        return {
+            "requests": requests,
+            "executions": executions,
+            "shared": shared,
+            "ratio": shared / requests if requests else 0.0,
+        }
+
+
+article_reads = SingleFlight()
+
+
+def coalescing_key(request) -> tuple:
+    """
+        Route plus normalized query params, the Accept header is part of
+        the key because it picks the renderer.
+    """
+    return (
+        request.method,
+        request.path,
+        urlencode(sorted(request.GET.lists()), doseq=True),
+        request.META.get("HTTP_ACCEPT", ""),
+    )
+
+
+class CoalescedReadMixin:
+    # Identical concurrent GET/HEAD requests run the view once and every
+    # waiter gets a copy of the rendered response. Only requests without
+    # a token or session that negotiate json are coalesced, other renderers
+    # (the browsable api) and authenticated responses can contain user data.
+    single_flight = article_reads
+
+    def coalescable(self, request, kwargs) -> bool:
+        if request.method not in ("GET", "HEAD"):
+            return False
+        if (
+            request.META.get("HTTP_AUTHORIZATION")
+            or request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+        ):
+            return False
+        try:
+            renderer, _ = self.get_content_negotiator().select_renderer(
+                Request(request), self.get_renderers(), kwargs.get("format")
+            )
+        except NotAcceptable:
+            return False
+        return isinstance(renderer, JSONRenderer)
+
+    def dispatch(self, request, *args, **kwargs):
+        if not self.coalescable(request, kwargs):
+            return super().dispatch(request, *args, **kwargs)
+
+        def render():
+            response = super(CoalescedReadMixin, self).dispatch(
+                request, *args, **kwargs
+            )
+            if hasattr(response, "render"):
+                response.render()
+            snapshot = (
+                response.status_code,
+                response.content,
+                tuple(response.items()),
+            )
+            return (response, snapshot)
+
+        (response, snapshot), shared = self.single_flight.do(
+            coalescing_key(request), render
+        )
+        if not shared:
+            return response
+
+        status_code, content, headers = snapshot
+        return HttpResponse(content, status=status_code, headers=dict(headers))
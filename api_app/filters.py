@@ -0,0 +1,41 @@
+from rest_framework.filters import BaseFilterBackend
+
+from .models import JSON_BODY_FILTER_KEYS
+
+
+class JsonBodyFilter(BaseFilterBackend):
+    """
+        Filter article lists by json_body keys, see ArticleQuerySet.filter_json_body.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        return queryset.filter_json_body(request.query_params)
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": key,
+                "required": False,
+                "in": "query",
+                "description": f"Only articles whose json_body {key} is this value.",
+                "schema": {"type": "string"},
+            }
+            for key in JSON_BODY_FILTER_KEYS
+        ]
+
+
+class UserArticleFilter(JsonBodyFilter):
+    """
+        json_body filters and ?archived=1, the archived list is handled by the view.
+    """
+
+    def get_schema_operation_parameters(self, view):
+        return super().get_schema_operation_parameters(view) + [
+            {
+                "name": "archived",
+                "required": False,
+                "in": "query",
+                "description": "1 lists the archived articles, json_body filters do not apply to them.",
+                "schema": {"type": "string", "enum": ["1", "true"]},
+            }
+        ]
@@ -0,0 +1,164 @@
+import http.client
+import os
+import select
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+def run_client(host, port, path, duration) -> tuple:
+    """
+        Send keep-alive GET requests for duration seconds,
+        this function return ( ok count, error count, latencies ).
+    """
+    connection = http.client.HTTPConnection(host, port, timeout=10)
+    ok, errors, latencies = 0, 0, []
+    deadline = time.monotonic() + duration
+    while time.monotonic() < deadline:
+        started = time.monotonic()
+        try:
+            connection.request("GET", path)
+            response = connection.getresponse()
+            response.read()
+        except (OSError, http.client.HTTPException):
+            errors += 1
+            connection.close()
+            connection = http.client.HTTPConnection(host, port, timeout=10)
+            continue
+        latencies.append(time.monotonic() - started)
+        if response.status < 400:
+            ok += 1
+        else:
+            errors += 1
+    connection.close()
+    return (ok, errors, latencies)
+
+
+def wait_for_http(host, port, path, timeout):
+    """
+        Poll path until it returns 200, the server is serving requests then.
+    """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        connection = http.client.HTTPConnection(host, port, timeout=1)
+        try:
+            connection.request("GET", path)
+            if connection.getresponse().status == 200:
+                return
+        except (OSError, http.client.HTTPException):
+            pass
+        finally:
+            connection.close()
+        time.sleep(0.2)
+    raise CommandError(f"Server did not serve {path} on {host}:{port} in {timeout}s.")
+
+
+def wait_for_line(server, line, timeout):
+    """
+        Read the server stdout until line, runworkers writes
+        "Workers are ready." once every worker listens.
+        stdout is unbuffered, so select sees every line that is not read yet.
+    """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        readable, _, _ = select.select(
+            [server.stdout], [], [], max(deadline - time.monotonic(), 0)
+        )
+        if not readable:
+            break
+        output = server.stdout.readline()
+        if not output:
+            break
+        if output.decode().strip() == line:
+            return
+    raise CommandError(f'Server did not write "{line}" in {timeout}s.')
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the throughput of plain daphne and runworkers "
+        "with concurrent keep-alive clients."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=8765)
+        parser.add_argument("--path", default="/articles/")
+        parser.add_argument("--duration", type=float, default=10)
+        parser.add_argument("--clients", type=int, default=os.cpu_count() or 1)
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+
+    def handle(self, *args, **options):
+        host, port = options["host"], options["port"]
+        application = settings.ASGI_APPLICATION.replace(".application", ":application")
+        servers = [
+            (
+                "daphne",
+                [
+                    sys.executable, "-m", "daphne",
+                    "-b", host, "-p", str(port), "-v", "0",
+                    application,
+                ],
+                None,
+            ),
+            (
+                f"runworkers x{options['workers']}",
+                [
+                    sys.executable, "manage.py", "runworkers",
+                    "--host", host, "--port", str(port),
+                    "--workers", str(options["workers"]),
+                    "--graceful-timeout", "5", "-v", "0",
+                ],
+                # runworkers listens before its workers are ready.
+                "Workers are ready.",
+            ),
+        ]
+
+        for name, command, ready_line in servers:
+            server = subprocess.Popen(
+                command, cwd=settings.BASE_DIR, stdout=subprocess.PIPE, bufsize=0
+            )
+            try:
+                if ready_line:
+                    wait_for_line(server, ready_line, 30)
+                wait_for_http(host, port, options["path"], 30)
+                ok, errors, latencies = self.load(options)
+            finally:
+                server.terminate()
+                server.wait()
+
+            if not latencies:
+                self.stdout.write(f"{name}: no responses, {errors} errors")
+                continue
+            percentiles = statistics.quantiles(latencies, n=100)
+            self.stdout.write(
+                f"{name}: {ok / options['duration']:.0f} req/s, "
+                f"p50 {percentiles[49] * 1000:.1f} ms, "
+                f"p99 {percentiles[98] * 1000:.1f} ms, "
+                f"{errors} errors"
+            )
+
+    def load(self, options) -> tuple:
+        with ProcessPoolExecutor(max_workers=options["clients"]) as executor:
+            results = [
+                executor.submit(
+                    run_client,
+                    options["host"],
+                    options["port"],
+                    options["path"],
+                    options["duration"],
+                )
+                for _ in range(options["clients"])
+            ]
+            ok, errors, latencies = 0, 0, []
+            for result in results:
+                client_ok, client_errors, client_latencies = result.result()
+                ok += client_ok
+                errors += client_errors
+                latencies += client_latencies
+        return (ok, errors, latencies)
@@ -0,0 +1,79 @@
+import os
+import re
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+# Boot a worker like daphne does, then print its peak RSS in KiB.
+BOOT_SCRIPT = """
+import resource
+from django.urls import get_resolver
+from core.asgi import application
+get_resolver().url_patterns
+print("maxrss", resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+IMPORT_TIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+
+class Command(BaseCommand):
+    help = (
+        "Report import time and memory of a fresh worker boot, "
+        "for the full and the API-only (DJANGO_API_ONLY=1) profile."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--profile",
+            choices=["full", "api", "both"],
+            default="both",
+        )
+        parser.add_argument(
+            "--top",
+            type=int,
+            default=15,
+            help="Number of slowest top level imports to show.",
+        )
+
+    def boot(self, api_only) -> tuple:
+        """
+            Boot a worker in a new interpreter with -X importtime,
+            this function return ( total import us, maxrss KiB, top imports ).
+        """
+        env = dict(os.environ, DJANGO_API_ONLY="1" if api_only else "0")
+        env.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", BOOT_SCRIPT],
+            cwd=settings.BASE_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+
+        imports = []
+        for line in result.stderr.splitlines():
+            match = IMPORT_TIME_LINE.match(line)
+            # one space of indent is a top level import.
+            if match and len(match.group(3)) == 1:
+                imports.append((int(match.group(2)), match.group(4)))
+        maxrss = int(result.stdout.split("maxrss")[-1])
+
+        return (sum(us for us, _ in imports), maxrss, sorted(imports, reverse=True))
+
+    def handle(self, *args, **options):
+        profiles = {
+            "full": [("full", False)],
+            "api": [("api", True)],
+            "both": [("full", False), ("api", True)],
+        }[options["profile"]]
+
+        for name, api_only in profiles:
+            total, maxrss, imports = self.boot(api_only)
+            self.stdout.write(
+                f"{name}: imports {total / 1000:.1f} ms, maxrss {maxrss / 1024:.1f} MiB"
+            )
+            for us, module in imports[:options["top"]]:
+                self.stdout.write(f"  {us / 1000:8.1f} ms  {module}")
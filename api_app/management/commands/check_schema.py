@@ -0,0 +1,48 @@
+import difflib
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from api_app import schema
+
+
+class Command(BaseCommand):
+    help = "Fail when settings.SCHEMA_FILE is not the schema generated from the code."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--write",
+            action="store_true",
+            help="Write the generated schema to the file instead of failing.",
+        )
+
+    def handle(self, *args, **options):
+        generated = schema.generate_schema()
+        try:
+            with open(settings.SCHEMA_FILE, "rb") as f:
+                current = f.read()
+        except FileNotFoundError:
+            current = b""
+
+        if generated == current:
+            self.stdout.write(f"{settings.SCHEMA_FILE} is up to date.")
+            return
+
+        if options["write"]:
+            with open(settings.SCHEMA_FILE, "wb") as f:
+                f.write(generated)
+            schema.clear_cache()
+            self.stdout.write(f"{settings.SCHEMA_FILE} is updated.")
+            return
+
+        diff = difflib.unified_diff(
+            current.decode().splitlines(),
+            generated.decode().splitlines(),
+            fromfile=str(settings.SCHEMA_FILE),
+            tofile="generated",
+            lineterm="",
+        )
+        raise CommandError(
+            "Schema drift, run \"python manage.py check_schema --write\".\n"
+            + "\n".join(list(diff)[:50])
+        )
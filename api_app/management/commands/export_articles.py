@@ -0,0 +1,54 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from api_app import bulk
+from api_app.models import Article, ArchivedArticle
+
+
+class Command(BaseCommand):
+    help = "Export articles as NDJSON in id order, streamed from the database."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help='NDJSON file, or "-" for stdout.')
+        parser.add_argument(
+            "--archived",
+            action="store_true",
+            help="Export the archive table instead of the hot table.",
+        )
+        parser.add_argument("--chunk-size", type=int, default=2000)
+        parser.add_argument(
+            "--checkpoint",
+            default=None,
+            help="File of the last exported id, an existing one resumes and appends.",
+        )
+
+    def handle(self, *args, **options):
+        model = ArchivedArticle if options["archived"] else Article
+        after_id = bulk.load_checkpoint(options["checkpoint"], "id")
+
+        if options["path"] == "-":
+            output = sys.stdout
+        else:
+            output = open(options["path"], "a" if after_id else "w")
+        # progress goes to stderr, stdout may be the export itself.
+        progress = bulk.Progress(self.stderr, "exported", every=options["chunk_size"])
+        try:
+            last_id = after_id
+            for last_id, line in bulk.export_lines(
+                model.objects.all(), after_id, options["chunk_size"]
+            ):
+                output.write(line)
+                progress.add(1)
+                if progress.rows % options["chunk_size"] == 0:
+                    output.flush()
+                    bulk.save_checkpoint(options["checkpoint"], "id", last_id)
+            output.flush()
+            bulk.save_checkpoint(options["checkpoint"], "id", last_id)
+        finally:
+            if output is not sys.stdout:
+                output.close()
+
+        self.stderr.write(
+            f"{progress.rows} articles exported, {progress.rate:.0f} rows/s."
+        )
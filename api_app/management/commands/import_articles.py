@@ -0,0 +1,93 @@
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+
+from api_app import bulk
+
+
+class Command(BaseCommand):
+    help = (
+        "Import articles from NDJSON, lines are validated by ArticleSerializer "
+        "in a process pool and written with bulk_create."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help='NDJSON file, or "-" for stdin.')
+        parser.add_argument(
+            "--user",
+            default=None,
+            help="Username of the owner for lines without a user.",
+        )
+        parser.add_argument(
+            "--archived",
+            action="store_true",
+            help="Import into the archive table, lines need their id.",
+        )
+        parser.add_argument("--workers", type=int, default=1)
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--checkpoint",
+            default=None,
+            help="File of the last imported line, an existing one resumes the import.",
+        )
+
+    def handle(self, *args, **options):
+        default_user_id = None
+        if options["user"]:
+            try:
+                default_user_id = User.objects.get(username=options["user"]).id
+            except User.DoesNotExist:
+                raise CommandError(f"User {options['user']} does not exist.")
+
+        skip = bulk.load_checkpoint(options["checkpoint"], "line")
+        if skip:
+            self.stdout.write(f"resuming after line {skip}")
+
+        stream = sys.stdin if options["path"] == "-" else open(options["path"])
+        progress = bulk.Progress(self.stdout, "imported")
+        failed = 0
+        try:
+            chunks = bulk.read_chunks(stream, options["batch_size"], skip)
+            for rows, errors, last_line in self.validated(chunks, options["workers"]):
+                with transaction.atomic():
+                    written, write_errors = bulk.write_rows(
+                        rows, default_user_id, options["archived"]
+                    )
+                for line_no, error in errors + write_errors:
+                    self.stderr.write(f"line {line_no}: {error}")
+                failed += len(errors) + len(write_errors)
+                bulk.save_checkpoint(options["checkpoint"], "line", last_line)
+                progress.add(written)
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+        self.stdout.write(
+            f"{progress.rows} articles imported, {failed} failed, "
+            f"{progress.rate:.0f} rows/s."
+        )
+
+    def validated(self, chunks, workers):
+        """
+            Yield validated chunks in file order,
+            at most two chunks per worker are in flight.
+        """
+        if workers <= 1:
+            yield from map(bulk.validate_chunk, chunks)
+            return
+
+        # forked workers must not share the parent database connection.
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=workers, initializer=django.setup) as executor:
+            pending = deque()
+            for chunk in chunks:
+                pending.append(executor.submit(bulk.validate_chunk, chunk))
+                if len(pending) >= workers * 2:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
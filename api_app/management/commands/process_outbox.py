@@ -0,0 +1,35 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from api_app import outbox
+
+
+class Command(BaseCommand):
+    help = "Drain the article outbox in batches and run its handlers."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=None)
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=1.0,
+            help="Seconds to sleep when the outbox is empty.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Drain pending events and exit.",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            processed, failed = outbox.drain(options["batch_size"])
+            if processed or failed:
+                self.stdout.write(f"processed: {processed}, failed: {failed}")
+                # keep going while there is a backlog, unless nothing succeed.
+                if processed:
+                    continue
+            if options["once"]:
+                return
+            time.sleep(options["interval"])
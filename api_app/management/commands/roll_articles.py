@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+
+from api_app import archive
+
+
+class Command(BaseCommand):
+    help = "Move articles older than the archive period from the hot table to the archive."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=None,
+            help="Archive articles older than this (default ARTICLE_ARCHIVE_AFTER_DAYS).",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=archive.DEFAULT_BATCH_SIZE,
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only count the articles that would be moved.",
+        )
+
+    def handle(self, *args, **options):
+        cutoff = archive.get_cutoff(options["days"])
+
+        if options["dry_run"]:
+            count = archive.rollable(cutoff).count()
+            self.stdout.write(f"{count} articles published before {cutoff:%Y-%m-%d} would be archived.")
+            return
+
+        total = 0
+        while moved := archive.roll_batch(cutoff, options["batch_size"]):
+            total += moved
+            self.stdout.write(f"archived: {total}")
+        self.stdout.write(f"{total} articles published before {cutoff:%Y-%m-%d} are archived.")
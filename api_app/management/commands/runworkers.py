@@ -0,0 +1,200 @@
+import os
+import select
+import signal
+import socket
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        "Run several daphne worker processes on one shared listening socket. "
+        "SIGHUP starts new workers and gracefully stops the old ones, "
+        "SIGTERM or SIGINT stops the server."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=8000)
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Number of worker processes (default is the number of cpus).",
+        )
+        parser.add_argument(
+            "--backlog",
+            type=int,
+            default=2048,
+            help="Listen queue size of the shared socket.",
+        )
+        parser.add_argument(
+            "--keepalive",
+            type=float,
+            default=60,
+            help="Seconds an idle keep-alive connection stays open.",
+        )
+        parser.add_argument(
+            "--http-timeout",
+            type=int,
+            default=None,
+            help="Seconds to wait for the application to respond.",
+        )
+        parser.add_argument(
+            "--graceful-timeout",
+            type=float,
+            default=30,
+            help="Seconds old workers get to finish their requests on reload and stop.",
+        )
+        parser.add_argument("--tls-cert", default=None, help="PEM certificate file.")
+        parser.add_argument("--tls-key", default=None, help="PEM private key file.")
+        parser.add_argument(
+            "--http2",
+            action="store_true",
+            help="Offer HTTP/2 with ALPN, needs TLS and the twisted http2 extra.",
+        )
+        parser.add_argument(
+            "--application",
+            default=settings.ASGI_APPLICATION.replace(".application", ":application"),
+        )
+
+    def handle(self, *args, **options):
+        tls = bool(options["tls_cert"] or options["tls_key"])
+        if tls and not (options["tls_cert"] and options["tls_key"]):
+            raise CommandError("--tls-cert and --tls-key should be used together.")
+        if options["http2"]:
+            from twisted.web import http
+
+            if not tls:
+                raise CommandError("HTTP/2 needs --tls-cert and --tls-key.")
+            if not http.H2_ENABLED:
+                raise CommandError('HTTP/2 needs "pip install twisted[http2]".')
+
+        family = socket.AF_INET6 if ":" in options["host"] else socket.AF_INET
+        self.socket = socket.create_server(
+            (options["host"], options["port"]),
+            family=family,
+            backlog=options["backlog"],
+        )
+        # workers accept until EWOULDBLOCK, a blocking socket would hang them.
+        self.socket.setblocking(False)
+        self.socket.set_inheritable(True)
+
+        self.options = options
+        self.endpoint = "worker:fileno=%d:family=%s:tls=%d" % (
+            self.socket.fileno(),
+            "INET6" if family == socket.AF_INET6 else "INET",
+            tls,
+        )
+        self.env = dict(
+            os.environ,
+            DAPHNE_KEEPALIVE_TIMEOUT=str(options["keepalive"]),
+            DAPHNE_HTTP2="1" if options["http2"] else "0",
+            DAPHNE_GRACEFUL_TIMEOUT=str(options["graceful_timeout"]),
+        )
+        if tls:
+            self.env["DAPHNE_TLS_CERT"] = options["tls_cert"]
+            self.env["DAPHNE_TLS_KEY"] = options["tls_key"]
+
+        self.reload = False
+        self.running = True
+        signal.signal(signal.SIGHUP, self.on_reload)
+        signal.signal(signal.SIGTERM, self.on_stop)
+        signal.signal(signal.SIGINT, self.on_stop)
+
+        host, port = self.socket.getsockname()[:2]
+        self.stdout.write(
+            f"Listening on {host}:{port} with {options['workers']} workers "
+            f"(pid {os.getpid()})."
+        )
+        workers = [self.spawn() for _ in range(options["workers"])]
+        try:
+            self.wait_ready(workers)
+            while self.running:
+                if self.reload:
+                    self.reload = False
+                    self.stdout.write("Reloading workers.")
+                    old, workers = workers, [self.spawn() for _ in workers]
+                    self.wait_ready(workers)
+                    self.stop(old)
+                workers = [
+                    worker if worker.poll() is None else self.respawn(worker)
+                    for worker in workers
+                ]
+                time.sleep(0.5)
+        finally:
+            self.stop(workers)
+            self.socket.close()
+
+    def spawn(self):
+        """
+            Start a worker, its ready attribute is a pipe that
+            becomes readable once the worker is listening.
+        """
+        ready, ready_write = os.pipe()
+        command = [
+            sys.executable, "-m", "core.worker",
+            "-e", self.endpoint,
+            "-v", str(self.options["verbosity"]),
+        ]
+        if self.options["http_timeout"] is not None:
+            command += ["--http-timeout", str(self.options["http_timeout"])]
+        command.append(self.options["application"])
+
+        worker = subprocess.Popen(
+            command,
+            cwd=settings.BASE_DIR,
+            env=dict(self.env, DAPHNE_READY_FD=str(ready_write)),
+            pass_fds=(self.socket.fileno(), ready_write),
+        )
+        os.close(ready_write)
+        worker.ready = ready
+        return worker
+
+    def wait_ready(self, workers):
+        """
+            Wait until new workers listen, so there is no gap on reload,
+            "Workers are ready." is written once all of them listen.
+        """
+        pending = {worker.ready for worker in workers}
+        deadline = time.monotonic() + self.options["graceful_timeout"]
+        while pending and time.monotonic() < deadline:
+            readable, _, _ = select.select(
+                list(pending), [], [], max(deadline - time.monotonic(), 0)
+            )
+            pending -= set(readable)
+        if not pending:
+            self.stdout.write("Workers are ready.")
+
+    def respawn(self, worker):
+        if not self.running:
+            return worker
+        self.stderr.write(f"Worker {worker.pid} exited with {worker.returncode}, restarting.")
+        os.close(worker.ready)
+        return self.spawn()
+
+    def stop(self, workers):
+        """
+            SIGTERM workers and wait up to the graceful timeout, then SIGKILL.
+        """
+        for worker in workers:
+            if worker.poll() is None:
+                worker.terminate()
+        deadline = time.monotonic() + self.options["graceful_timeout"]
+        for worker in workers:
+            try:
+                worker.wait(max(deadline - time.monotonic(), 0))
+            except subprocess.TimeoutExpired:
+                worker.kill()
+                worker.wait()
+            os.close(worker.ready)
+
+    def on_reload(self, signum, frame):
+        self.reload = True
+
+    def on_stop(self, signum, frame):
+        self.running = False
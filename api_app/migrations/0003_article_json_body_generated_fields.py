@@ -0,0 +1,29 @@
+# Generated by Django 5.1.5 on 2026-10-19 11:16
+
+import django.db.models.fields.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api_app', '0002_alter_article_title'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='json_author',
+            field=models.GeneratedField(db_index=True, db_persist=True, expression=django.db.models.fields.json.KeyTextTransform('author', 'json_body'), output_field=models.TextField(null=True)),
+        ),
+        migrations.AddField(
+            model_name='article',
+            name='json_category',
+            field=models.GeneratedField(db_index=True, db_persist=True, expression=django.db.models.fields.json.KeyTextTransform('category', 'json_body'), output_field=models.TextField(null=True)),
+        ),
+        migrations.AddField(
+            model_name='article',
+            name='json_language',
+            field=models.GeneratedField(db_index=True, db_persist=True, expression=django.db.models.fields.json.KeyTextTransform('language', 'json_body'), output_field=models.TextField(null=True)),
+        ),
+    ]
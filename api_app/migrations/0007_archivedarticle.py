@@ -0,0 +1,38 @@
+# Generated by Django 5.1.5 on 2026-10-19 11:29
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api_app', '0006_article_user_pub_date_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='articleevent',
+            name='kind',
+            field=models.CharField(choices=[('created', 'Created'), ('updated', 'Updated'), ('activated', 'Activated'), ('rejected', 'Rejected'), ('archived', 'Archived'), ('deleted', 'Deleted')], max_length=16),
+        ),
+        migrations.CreateModel(
+            name='ArchivedArticle',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('title', models.CharField(max_length=128)),
+                ('json_body', models.JSONField()),
+                ('pub_date', models.DateTimeField()),
+                ('is_active', models.BooleanField(default=False)),
+                ('slug', models.SlugField(allow_unicode=True, unique=True)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_articles', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name_plural': 'archived articles',
+                'ordering': ['-pub_date'],
+            },
+        ),
+    ]
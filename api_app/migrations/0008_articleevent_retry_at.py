@@ -0,0 +1,18 @@
+# Generated by Django 5.1.5 on 2026-10-19 11:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api_app', '0007_archivedarticle'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='articleevent',
+            name='retry_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -1,16 +1,56 @@
 from django.db import models
+from django.db.models.fields.json import KT
 from django.contrib.auth.models import User
 from django.utils.translation import gettext_lazy as _
 from django.utils import timezone
 from django.utils.text import slugify
 from rest_framework.authtoken.models import Token
 
+from . import caching
 
-class ArticleQuerySet(models.QuerySet):
+
+# json_body keys that can be filtered on,
+# each one has an indexed generated column named json_<key> on Article.
+JSON_BODY_FILTER_KEYS = ("category", "language", "author")
+
+
+class PublishedQuerySet(models.QuerySet):
     def published(self):
         return self.filter(is_active=True, pub_date__lte=timezone.now())
 
 
+class ArticleQuerySet(PublishedQuerySet):
+    def filter_json_body(self, params):
+        """
+            Filter by whitelisted json_body keys found in params,
+            lookups go to the indexed generated columns, not json_body itself.
+        """
+        return self.filter(**{
+            f"json_{key}": params[key]
+            for key in JSON_BODY_FILTER_KEYS if key in params
+        })
+
+    def pending(self):
+        """
+            Articles waiting for moderation, oldest first,
+            this matches the partial index article_pending_idx.
+        """
+        return self.filter(
+            is_active=False, rejected_at__isnull=True
+        ).order_by("pub_date", "id")
+
+    def claimable(self, user, now=None):
+        """
+            Articles that are not leased, or leased by user, or the lease is expired.
+        """
+        now = now or timezone.now()
+        return self.filter(
+            models.Q(claimed_until__isnull=True)
+            | models.Q(claimed_until__lt=now)
+            | models.Q(claimed_by=user)
+        )
+
+
 class Article(models.Model):
     title = models.CharField(
         max_length=128,
@@ -23,24 +63,141 @@ class Article(models.Model):
     is_active = models.BooleanField(default=False)
     slug = models.SlugField(allow_unicode=True, unique=True)
     user = models.ForeignKey(User, on_delete=models.CASCADE)
+    json_category = models.GeneratedField(
+        expression=KT("json_body__category"),
+        output_field=models.TextField(null=True),
+        db_persist=True,
+        db_index=True,
+    )
+    json_language = models.GeneratedField(
+        expression=KT("json_body__language"),
+        output_field=models.TextField(null=True),
+        db_persist=True,
+        db_index=True,
+    )
+    json_author = models.GeneratedField(
+        expression=KT("json_body__author"),
+        output_field=models.TextField(null=True),
+        db_persist=True,
+        db_index=True,
+    )
+    rejected_at = models.DateTimeField(null=True, blank=True)
+    claimed_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="claimed_articles",
+    )
+    claimed_until = models.DateTimeField(null=True, blank=True)
 
     objects = ArticleQuerySet.as_manager()
 
     class Meta:
         ordering = ["-pub_date",]
         indexes = [
-            models.Index(fields=["title", "pub_date", "is_active"])
+            models.Index(fields=["title", "pub_date", "is_active"]),
+            models.Index(fields=["user", "-pub_date"], name="article_user_pub_date_idx"),
+            models.Index(
+                fields=["pub_date", "id"],
+                condition=models.Q(is_active=False, rejected_at__isnull=True),
+                name="article_pending_idx",
+            ),
         ]
         verbose_name_plural = "articles"
 
+    def make_slug(self):
+        return slugify(f"{self.title}-{self.pub_date}")
+
     def save(self, *args, **kwargs):
-        self.slug = slugify(f"{self.title}-{self.pub_date}")
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None or {"title", "pub_date"} & set(update_fields):
+            self.slug = self.make_slug()
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "slug"}
         super().save(*args, **kwargs)
+        caching.invalidate_user(self.user_id)
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        caching.invalidate_user(self.user_id)
+        return result
 
     def __str__(self):
         return self.title
 
 
+class ArchivedArticle(models.Model):
+    """
+        Cold tier of Article, old articles are moved here by the
+        roll_articles command, so the indexes of Article stay small.
+        Archived articles are read only.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    title = models.CharField(max_length=128)
+    json_body = models.JSONField()
+    pub_date = models.DateTimeField()
+    is_active = models.BooleanField(default=False)
+    slug = models.SlugField(allow_unicode=True, unique=True)
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="archived_articles",
+    )
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    objects = PublishedQuerySet.as_manager()
+
+    class Meta:
+        ordering = ["-pub_date",]
+        verbose_name_plural = "archived articles"
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        caching.invalidate_user(self.user_id)
+        return result
+
+    def __str__(self):
+        return self.title
+
+
+class ArticleEvent(models.Model):
+    """
+        Outbox row, written in the same transaction as the article change
+        and drained later by the process_outbox command.
+    """
+    class Kind(models.TextChoices):
+        CREATED = "created", _("Created")
+        UPDATED = "updated", _("Updated")
+        ACTIVATED = "activated", _("Activated")
+        REJECTED = "rejected", _("Rejected")
+        ARCHIVED = "archived", _("Archived")
+        DELETED = "deleted", _("Deleted")
+
+    article_id = models.BigIntegerField()
+    slug = models.SlugField(allow_unicode=True, db_index=False)
+    user_id = models.BigIntegerField()
+    kind = models.CharField(max_length=16, choices=Kind.choices)
+    created = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    # a failed event is not retried before this time.
+    retry_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["id",]
+        indexes = [
+            models.Index(
+                fields=["id"],
+                condition=models.Q(processed_at__isnull=True),
+                name="article_event_pending_idx",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.slug}"
+
+
 class ExpiredTokenProxy(Token):
     class Meta:
         proxy = True
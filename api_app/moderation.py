@@ -0,0 +1,115 @@
+import base64
+from datetime import datetime
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Article, ArticleEvent
+
+DEFAULT_LEASE_SECONDS = 300
+
+
+def encode_cursor(article) -> str:
+    value = f"{article.pub_date.isoformat()}|{article.pk}"
+    return base64.urlsafe_b64encode(value.encode()).decode()
+
+
+def decode_cursor(cursor) -> tuple:
+    """
+        this function return ( pub_date, id ) of the last seen article,
+        it raise ValueError if cursor is not valid.
+    """
+    try:
+        value = base64.urlsafe_b64decode(cursor.encode()).decode()
+        pub_date, pk = value.split("|")
+        return (datetime.fromisoformat(pub_date), int(pk))
+    except Exception as exc:
+        raise ValueError("Invalid cursor.") from exc
+
+
+def queue_page(cursor=None, limit=20) -> tuple:
+    """
+        Keyset pagination over pending articles,
+        this function return ( articles, next cursor or None ).
+    """
+    queryset = Article.objects.pending()
+    if cursor:
+        pub_date, pk = decode_cursor(cursor)
+        queryset = queryset.filter(
+            Q(pub_date__gt=pub_date) | Q(pub_date=pub_date, id__gt=pk)
+        )
+
+    articles = list(queryset[:limit + 1])
+    if len(articles) > limit:
+        return (articles[:limit], encode_cursor(articles[limit - 1]))
+    return (articles, None)
+
+
+def claim(user, limit) -> list:
+    """
+        Lease up to limit pending articles to user, oldest first.
+        The claimable condition is checked again in the UPDATE,
+        so two moderators can never lease the same article.
+    """
+    now = timezone.now()
+    lease = getattr(settings, "MODERATION_LEASE_SECONDS", DEFAULT_LEASE_SECONDS)
+    claimed_until = now + timezone.timedelta(seconds=lease)
+
+    with transaction.atomic():
+        ids = list(
+            Article.objects.pending()
+            .claimable(user, now)
+            .select_for_update(skip_locked=True)
+            .values_list("id", flat=True)[:limit]
+        )
+        Article.objects.pending().claimable(user, now).filter(id__in=ids).update(
+            claimed_by=user, claimed_until=claimed_until
+        )
+
+    return list(
+        Article.objects.pending().filter(
+            id__in=ids, claimed_by=user, claimed_until=claimed_until
+        )
+    )
+
+
+def moderate(user, approve, reject) -> dict:
+    """
+        Approve or reject pending articles by slug in one transaction,
+        articles leased by another moderator are skipped.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        queryset = (
+            Article.objects.pending()
+            .claimable(user, now)
+            .select_for_update()
+        )
+        approved = list(queryset.filter(slug__in=approve))
+        rejected = list(queryset.filter(slug__in=reject).exclude(slug__in=approve))
+
+        Article.objects.filter(id__in=[article.id for article in approved]).update(
+            is_active=True, claimed_by=None, claimed_until=None
+        )
+        Article.objects.filter(id__in=[article.id for article in rejected]).update(
+            rejected_at=now, claimed_by=None, claimed_until=None
+        )
+        ArticleEvent.objects.bulk_create(
+            [
+                ArticleEvent(
+                    article_id=article.pk,
+                    slug=article.slug,
+                    user_id=article.user_id,
+                    kind=kind,
+                )
+                for kind, articles in [
+                    (ArticleEvent.Kind.ACTIVATED, approved),
+                    (ArticleEvent.Kind.REJECTED, rejected),
+                ]
+                for article in articles
+            ]
+        )
+
+    return {"approved": len(approved), "rejected": len(rejected)}
@@ -0,0 +1,110 @@
+import logging
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import ArticleEvent
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_MAX_ATTEMPTS = 10
+DEFAULT_RETRY_SECONDS = 5
+MAX_RETRY_SECONDS = 3600
+
+
+def record(article, kind) -> ArticleEvent:
+    """
+        Write an outbox event for article,
+        call it inside the transaction that changes the article.
+    """
+    return ArticleEvent.objects.create(
+        article_id=article.pk,
+        slug=article.slug,
+        user_id=article.user_id,
+        kind=kind,
+    )
+
+
+def get_handlers() -> list:
+    """
+        Handlers are dotted paths in settings.ARTICLE_OUTBOX_HANDLERS,
+        each one is called with a single ArticleEvent.
+    """
+    return [
+        import_string(path)
+        for path in getattr(settings, "ARTICLE_OUTBOX_HANDLERS", [])
+    ]
+
+
+def retry_delay(attempts) -> timezone.timedelta:
+    """
+        Exponential backoff after the given number of failed attempts.
+    """
+    base = getattr(settings, "ARTICLE_OUTBOX_RETRY_SECONDS", DEFAULT_RETRY_SECONDS)
+    return timezone.timedelta(
+        seconds=min(base * 2 ** (attempts - 1), MAX_RETRY_SECONDS)
+    )
+
+
+def drain(batch_size=None) -> tuple:
+    """
+        Process one batch of pending events, this function return
+        ( processed count, failed count ).
+        Events are only marked as processed after every handler succeed,
+        so delivery is at-least-once and handlers should be idempotent.
+        A failed event waits for its retry_at, after
+        ARTICLE_OUTBOX_MAX_ATTEMPTS it is left unprocessed (dead letter),
+        so failing events do not block the newer ones.
+    """
+    if batch_size is None:
+        batch_size = getattr(
+            settings, "ARTICLE_OUTBOX_BATCH_SIZE", DEFAULT_BATCH_SIZE
+        )
+    max_attempts = getattr(
+        settings, "ARTICLE_OUTBOX_MAX_ATTEMPTS", DEFAULT_MAX_ATTEMPTS
+    )
+    handlers = get_handlers()
+    now = timezone.now()
+
+    with transaction.atomic():
+        events = list(
+            ArticleEvent.objects
+            .filter(processed_at__isnull=True, attempts__lt=max_attempts)
+            .filter(Q(retry_at__isnull=True) | Q(retry_at__lte=now))
+            .select_for_update(skip_locked=True)[:batch_size]
+        )
+
+        processed, failed = [], []
+        for event in events:
+            try:
+                # a savepoint per event, a failed handler (a database error
+                # aborts the transaction on postgresql) does not break the batch.
+                with transaction.atomic():
+                    for handler in handlers:
+                        handler(event)
+                processed.append(event.pk)
+            except Exception:
+                logger.exception("Outbox event %s failed.", event.pk)
+                failed.append(event)
+
+        if processed:
+            ArticleEvent.objects.filter(pk__in=processed).update(
+                processed_at=timezone.now(),
+                attempts=F("attempts") + 1,
+            )
+        for event in failed:
+            event.attempts += 1
+            event.retry_at = now + retry_delay(event.attempts)
+            event.save(update_fields=["attempts", "retry_at"])
+            if event.attempts >= max_attempts:
+                logger.error(
+                    "Outbox event %s failed %s times, it is not retried.",
+                    event.pk,
+                    event.attempts,
+                )
+
+    return (len(processed), len(failed))
@@ -0,0 +1,136 @@
+import io
+import re
+
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions, status
+from rest_framework.parsers import JSONParser
+
+DEFAULT_MAX_BYTES = 1024 * 1024
+DEFAULT_MAX_DEPTH = 32
+DEFAULT_MAX_KEYS = 10000
+CHUNK_SIZE = 64 * 1024
+
+# escapes are matched as one token, so an escaped quote does not end a string.
+JSON_TOKEN = re.compile(rb'\\.|["\[\]{}:]', re.DOTALL)
+
+
+class RequestEntityTooLarge(exceptions.APIException):
+    status_code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    default_detail = _("Request body is too large.")
+    default_code = "request_entity_too_large"
+
+
+def get_limit(name, default):
+    return getattr(settings, f"JSON_UPLOAD_{name}", default)
+
+
+def read_limited(stream, max_bytes) -> bytes:
+    """
+        Read the body in chunks and stop as soon as it is over max_bytes,
+        instead of reading the whole upload into memory first.
+    """
+    chunks, size = [], 0
+    while True:
+        chunk = stream.read(CHUNK_SIZE)
+        if not chunk:
+            return b"".join(chunks)
+        size += len(chunk)
+        if size > max_bytes:
+            raise RequestEntityTooLarge()
+        chunks.append(chunk)
+
+
+def too_deep(max_depth):
+    return exceptions.ParseError(
+        _("JSON is nested deeper than %(max)s.") % {"max": max_depth}
+    )
+
+
+def too_many_keys(max_keys):
+    return exceptions.ParseError(
+        _("JSON has more than %(max)s keys.") % {"max": max_keys}
+    )
+
+
+def check_structure(data, max_depth, max_keys):
+    """
+        Check nesting depth and key count on the raw bytes,
+        before json builds any python object for them.
+        One linear pass over the quotes, escapes, brackets and colons,
+        the ones inside strings are skipped.
+    """
+    depth = keys = 0
+    in_string = False
+    for match in JSON_TOKEN.finditer(data):
+        token = match.group()
+        if token == b'"':
+            in_string = not in_string
+        elif in_string or len(token) == 2:
+            continue
+        elif token in b"[{":
+            depth += 1
+            if depth > max_depth:
+                raise too_deep(max_depth)
+        elif token == b":":
+            keys += 1
+            if keys > max_keys:
+                raise too_many_keys(max_keys)
+        else:
+            depth -= 1
+    if in_string:
+        raise exceptions.ParseError(_("JSON has an unterminated string."))
+
+
+def check_value(value, max_depth, max_keys, depth=1):
+    """
+        The same limits on an already decoded value, for json sent in form
+        fields, depth is the number of containers value is nested in.
+    """
+    keys = 0
+    stack = [(value, depth)]
+    while stack:
+        value, depth = stack.pop()
+        if isinstance(value, dict):
+            keys += len(value)
+            children = value.values()
+        elif isinstance(value, list):
+            children = value
+        else:
+            continue
+        if depth + 1 > max_depth:
+            raise too_deep(max_depth)
+        if keys > max_keys:
+            raise too_many_keys(max_keys)
+        stack.extend((child, depth + 1) for child in children)
+
+
+class LimitedJSONParser(JSONParser):
+    """
+        JSONParser with body size, depth and key count limits
+        (settings.JSON_UPLOAD_MAX_BYTES, JSON_UPLOAD_MAX_DEPTH, JSON_UPLOAD_MAX_KEYS).
+    """
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        max_bytes = get_limit("MAX_BYTES", DEFAULT_MAX_BYTES)
+
+        request = (parser_context or {}).get("request")
+        if request is not None:
+            try:
+                content_length = int(request.META.get("CONTENT_LENGTH") or 0)
+            except ValueError:
+                content_length = 0
+            if content_length > max_bytes:
+                raise RequestEntityTooLarge()
+
+        data = read_limited(stream, max_bytes)
+        check_structure(
+            data,
+            get_limit("MAX_DEPTH", DEFAULT_MAX_DEPTH),
+            get_limit("MAX_KEYS", DEFAULT_MAX_KEYS),
+        )
+        return super().parse(io.BytesIO(data), media_type, parser_context)
+
+
+class MergePatchJSONParser(LimitedJSONParser):
+    media_type = "application/merge-patch+json"
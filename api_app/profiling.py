@@ -0,0 +1,198 @@
+import logging
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DatabaseError, connection
+from rest_framework import exceptions
+
+from .authentication import TokenNotExpiredAuth
+
+logger = logging.getLogger(__name__)
+
+# Distinct stacks kept in memory, samples of new stacks are dropped after it.
+MAX_STACKS = 10000
+
+
+def collapse(frame) -> str:
+    """
+        Stack of a frame in collapsed format, root first,
+        "module.function;module.function" like flamegraph.pl and speedscope read it.
+    """
+    names = []
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "?")
+        names.append(f"{module}.{frame.f_code.co_qualname}")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class StackProfile:
+    """
+        Aggregated stack samples of the profiled requests of this process.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stacks = Counter()
+        self.requests = 0
+        self.samples = 0
+        self.dropped = 0
+
+    def add(self, stack):
+        with self._lock:
+            self.samples += 1
+            if stack in self._stacks or len(self._stacks) < MAX_STACKS:
+                self._stacks[stack] += 1
+            else:
+                self.dropped += 1
+
+    def add_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def clear(self):
+        with self._lock:
+            self._stacks.clear()
+            self.requests = self.samples = self.dropped = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "samples": self.samples,
+                "dropped": self.dropped,
+                "stacks": [
+                    {"stack": stack, "count": count}
+                    for stack, count in self._stacks.most_common()
+                ],
+            }
+
+
+request_profile = StackProfile()
+
+
+class StackSampler:
+    """
+        Sample the stack of one thread every interval seconds from a
+        background thread, the profiled thread does not run any tracing code.
+    """
+
+    def __init__(self, profile, interval, thread_id=None):
+        self.profile = profile
+        self.interval = interval
+        self.thread_id = thread_id or threading.get_ident()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self.run, daemon=True)
+
+    def __enter__(self):
+        self.profile.add_request()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stopped.set()
+        self._thread.join()
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.profile.add(collapse(frame))
+            del frame
+
+
+class SlowQueryLogger:
+    """
+        Database execute wrapper, logs queries slower than threshold_ms
+        with the EXPLAIN output of the database.
+    """
+
+    def __init__(self, threshold_ms):
+        self.threshold_ms = threshold_ms
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            if elapsed_ms >= self.threshold_ms:
+                logger.warning(
+                    "Slow query (%.1f ms): %s\n%s",
+                    elapsed_ms,
+                    sql,
+                    self.explain(context["connection"], sql, params, many),
+                )
+
+    def explain(self, db, sql, params, many) -> str:
+        if many or not sql.lstrip().upper().startswith("SELECT"):
+            return "No plan, only SELECT queries are explained."
+        # a new cursor of the backend, it does not go through the execute
+        # wrappers and does not discard the rows of the slow query.
+        cursor = db.create_cursor()
+        try:
+            cursor.execute(f"{db.ops.explain_query_prefix()} {sql}", params)
+            return "\n".join(
+                " ".join(str(column) for column in row)
+                for row in cursor.fetchall()
+            )
+        except DatabaseError as exc:
+            return f"No plan: {exc}"
+        finally:
+            cursor.close()
+
+
+def is_superuser(request) -> bool:
+    try:
+        auth = TokenNotExpiredAuth().authenticate(request)
+    except exceptions.AuthenticationFailed:
+        return False
+    return auth is not None and auth[0].is_superuser
+
+
+def should_profile(request) -> bool:
+    """
+        PROFILING_HEADER is only honoured for superuser tokens,
+        other clients can not start samplers.
+    """
+    header = settings.PROFILING_HEADER
+    if header and request.headers.get(header) and is_superuser(request):
+        return True
+    rate = settings.PROFILING_SAMPLE_RATE
+    return bool(rate) and random.random() < rate
+
+
+class ProfilingMiddleware:
+    """
+        Opt-in profiling of requests, see PROFILING_* and SLOW_QUERY_MS settings.
+        Sync middleware, under ASGI the request and its queries run in
+        the thread that is sampled. When all of them are off it is not loaded,
+        so the async middleware chain does not switch to a thread for it.
+    """
+
+    def __init__(self, get_response):
+        if (
+            not settings.PROFILING_HEADER
+            and not settings.PROFILING_SAMPLE_RATE
+            and settings.SLOW_QUERY_MS is None
+        ):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with ExitStack() as stack:
+            if settings.SLOW_QUERY_MS is not None:
+                stack.enter_context(
+                    connection.execute_wrapper(SlowQueryLogger(settings.SLOW_QUERY_MS))
+                )
+            if should_profile(request):
+                stack.enter_context(
+                    StackSampler(request_profile, settings.PROFILING_INTERVAL)
+                )
+            return self.get_response(request)
@@ -0,0 +1,18 @@
+from rest_framework.renderers import BaseRenderer
+
+
+class CollapsedStackRenderer(BaseRenderer):
+    """
+        Render profile stacks as collapsed stack lines, "stack count",
+        the input of flamegraph.pl, speedscope and inferno.
+    """
+    media_type = "text/plain"
+    format = "collapsed"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if not isinstance(data, dict) or "stacks" not in data:
+            return ""
+        return "".join(
+            f"{item['stack']} {item['count']}\n" for item in data["stacks"]
+        )
@@ -0,0 +1,86 @@
+import hashlib
+import json
+import threading
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.views.decorators.http import require_safe
+
+CONTENT_TYPES = {
+    "yaml": "application/vnd.oai.openapi; charset=utf-8",
+    "json": "application/vnd.oai.openapi+json",
+}
+
+_lock = threading.Lock()
+_cache = {}
+
+
+def generate_schema() -> bytes:
+    """
+        Render the OpenAPI yaml from the code,
+        the same way "python manage.py spectacular" does.
+    """
+    from drf_spectacular.renderers import OpenApiYamlRenderer
+    from drf_spectacular.settings import spectacular_settings
+
+    generator = spectacular_settings.DEFAULT_GENERATOR_CLASS()
+    schema = generator.get_schema(request=None, public=True)
+    return OpenApiYamlRenderer().render(schema, renderer_context={})
+
+
+def load_schema() -> bytes:
+    """
+        Read the prebuilt settings.SCHEMA_FILE,
+        or generate the schema if there is no file.
+    """
+    schema_file = getattr(settings, "SCHEMA_FILE", None)
+    if schema_file:
+        try:
+            with open(schema_file, "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            pass
+    return generate_schema()
+
+
+def get_schema(format="yaml") -> tuple:
+    """
+        this function return ( content, etag ),
+        both are built once per process and kept in memory.
+    """
+    with _lock:
+        if "yaml" not in _cache:
+            _cache["yaml"] = with_etag(load_schema())
+        if format == "json" and "json" not in _cache:
+            import yaml
+
+            content = json.dumps(yaml.safe_load(_cache["yaml"][0])).encode()
+            _cache["json"] = with_etag(content)
+        return _cache[format]
+
+
+def with_etag(content) -> tuple:
+    return (content, '"%s"' % hashlib.sha256(content).hexdigest()[:32])
+
+
+def clear_cache():
+    with _lock:
+        _cache.clear()
+
+
+@require_safe
+def schema_view(request):
+    """
+        Serve the cached OpenAPI schema, yaml by default or json with ?format=json,
+        clients can revalidate with If-None-Match and get 304.
+    """
+    format = "json" if request.GET.get("format") == "json" else "yaml"
+    content, etag = get_schema(format)
+
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = HttpResponse(content, content_type=CONTENT_TYPES[format])
+    response["ETag"] = etag
+    patch_cache_control(response, no_cache=True)
+    return response
@@ -1,17 +1,82 @@
 from rest_framework import serializers
+from rest_framework.exceptions import ParseError
 
-from .models import Article
+from .models import Article, ArchivedArticle
+from . import parsers, validators
+
+
+def merge_patch(target, patch):
+    """
+        JSON merge patch (RFC 7386), None values remove keys.
+    """
+    if not isinstance(patch, dict):
+        return patch
+    if not isinstance(target, dict):
+        target = {}
+
+    result = dict(target)
+    for key, value in patch.items():
+        if value is None:
+            result.pop(key, None)
+        else:
+            result[key] = merge_patch(result.get(key), value)
+    return result
 
 
 class ArticleSerializer(serializers.ModelSerializer):
     class Meta:
         model = Article
-        exclude = ["is_active",]
+        exclude = [
+            "is_active",
+            "json_category",
+            "json_language",
+            "json_author",
+            "rejected_at",
+            "claimed_by",
+            "claimed_until",
+        ]
         read_only_fields = ["user", "slug"]
 
+    def validate_json_body(self, value):
+        # form and multipart values are decoded by the field, not by
+        # LimitedJSONParser, so the limits are checked here for every content type.
+        try:
+            parsers.check_value(
+                value,
+                parsers.get_limit("MAX_DEPTH", parsers.DEFAULT_MAX_DEPTH),
+                parsers.get_limit("MAX_KEYS", parsers.DEFAULT_MAX_KEYS),
+            )
+        except ParseError as exc:
+            raise serializers.ValidationError(exc.detail)
+        if self.partial and self.instance is not None:
+            value = merge_patch(self.instance.json_body, value)
+        return validators.validate_json_body(value)
+
     def update(self, instance, validated_data):
-        instance.is_active = False
-        return super().update(instance, validated_data)
+        """
+            Only write the columns that changed, they are kept in
+            self.changed_fields, a changed article goes back to the moderation queue.
+        """
+        update_fields = set()
+        for attr, value in validated_data.items():
+            if getattr(instance, attr) != value:
+                setattr(instance, attr, value)
+                update_fields.add(attr)
+
+        if update_fields:
+            instance.is_active = False
+            instance.rejected_at = None
+            update_fields |= {"is_active", "rejected_at"}
+            instance.save(update_fields=update_fields)
+        self.changed_fields = update_fields
+        return instance
+
+
+class ArchivedArticleSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ArchivedArticle
+        fields = ["id", "title", "json_body", "pub_date", "slug", "user"]
+        read_only_fields = fields
 
 
 class UserLoginSerializer(serializers.Serializer):
@@ -26,4 +91,52 @@ class AdminArticlesSerializer(serializers.ModelSerializer):
         read_only_fields = ["title", "slug", "user"]
         extra_kwargs = {
             'is_active': {'required': True}
-        }
\ No newline at end of file
+        }
+
+
+class ModerationQueueSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Article
+        fields = ["title", "slug", "pub_date", "user", "claimed_by", "claimed_until"]
+        read_only_fields = fields
+
+
+class ModerationQuerySerializer(serializers.Serializer):
+    cursor = serializers.CharField(required=False)
+    limit = serializers.IntegerField(min_value=1, max_value=100, default=20)
+
+
+class ClaimSerializer(serializers.Serializer):
+    limit = serializers.IntegerField(min_value=1, max_value=100, default=10)
+
+
+class ModerateSerializer(serializers.Serializer):
+    approve = serializers.ListField(
+        child=serializers.SlugField(allow_unicode=True),
+        max_length=100,
+        default=list,
+    )
+    reject = serializers.ListField(
+        child=serializers.SlugField(allow_unicode=True),
+        max_length=100,
+        default=list,
+    )
+
+
+class CoalescingStatsSerializer(serializers.Serializer):
+    requests = serializers.IntegerField()
+    executions = serializers.IntegerField()
+    shared = serializers.IntegerField()
+    ratio = serializers.FloatField()
+
+
+class ProfileStackSerializer(serializers.Serializer):
+    stack = serializers.CharField()
+    count = serializers.IntegerField()
+
+
+class ProfileSerializer(serializers.Serializer):
+    requests = serializers.IntegerField()
+    samples = serializers.IntegerField()
+    dropped = serializers.IntegerField()
+    stacks = ProfileStackSerializer(many=True)
@@ -1,16 +1,62 @@
-from django.test import TestCase
+import http.client
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from contextlib import redirect_stderr
+from io import StringIO
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.management import call_command
+from django.db import connection
+from django.http import QueryDict
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth.models import User
 from django.utils import timezone
 from rest_framework.test import APIClient
 from rest_framework.authtoken.models import Token
 from rest_framework import status
+from rest_framework.exceptions import ParseError
 
 from .serializers import (
     UserLoginSerializer,
     ArticleSerializer,
     AdminArticlesSerializer
 )
-from .models import Article
+from .models import Article, ArchivedArticle, ArticleEvent
+from .parsers import check_structure
+from .coalescing import SingleFlight, article_reads
+from .profiling import ProfilingMiddleware, StackProfile, StackSampler, request_profile
+from . import caching, outbox
+
+handled_events = []
+
+
+def record_event_handler(event):
+    handled_events.append(event.pk)
+
+
+def failing_event_handler(event):
+    raise RuntimeError("handler failed")
+
+
+def database_failing_event_handler(event):
+    User.objects.create(username=f"handler{event.pk}")
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT * FROM missing_table")
+
+
+def rejected_failing_event_handler(event):
+    if event.kind == ArticleEvent.Kind.REJECTED:
+        raise RuntimeError("handler failed")
+    handled_events.append(event.pk)
+
 
 class BaseTokenAuthViewSetTestCase(TestCase):
     def setUp(self):
@@ -138,6 +184,28 @@ class ArticleListViewSetTestCase(TestCase):
         )
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
 
+    def test_filter_json_body(self):
+        for category, language in [("news", "en"), ("news", "fa"), ("sport", "en")]:
+            Article.objects.create(
+                title=f"{category}-{language}",
+                json_body={"category": category, "language": language},
+                is_active=True,
+                user=self.user,
+            )
+
+        response = self.client.get(path=self.url, data={"category": "news"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 2)
+
+        response = self.client.get(
+            path=self.url, data={"category": "news", "language": "en"}
+        )
+        self.assertEqual(len(response.data), 1)
+        self.assertEqual(response.data[0]["title"], "news-en")
+
+        response = self.client.get(path=self.url, data={"not_whitelisted": "x"})
+        self.assertEqual(len(response.data), 8)
+
 
 class UserArticleViewSet(TestCase):
     def setUp(self):
@@ -189,6 +257,28 @@ class UserArticleViewSet(TestCase):
         self.assertTrue(serializer.is_valid())
         self.assertEqual(len(serializer.validated_data), 10)
 
+    def test_list_article_cached(self):
+        response = self.client.get(path=self.url, format="json")
+        self.assertEqual(len(response.data), 10)
+
+        # update() does not call save, so the cached list is served.
+        Article.objects.filter(id=self.article1.id).update(title="not invalidated")
+        response = self.client.get(path=self.url, format="json")
+        self.assertNotIn("not invalidated", [article["title"] for article in response.data])
+
+        self.client.delete(path=self.url + self.article3.slug + "/")
+        response = self.client.get(path=self.url, format="json")
+        self.assertEqual(len(response.data), 9)
+        self.assertIn("not invalidated", [article["title"] for article in response.data])
+
+        response = self.client.get(path=self.url, data={"category": "news"}, format="json")
+        self.assertEqual(len(response.data), 0)
+
+        self.assertEqual(
+            caching.list_key(self.user.id, QueryDict("x=1&category=news")),
+            caching.list_key(self.user.id, QueryDict("category=news")),
+        )
+
     def test_retrieve_article(self):
         response = self.client.get(
             path=self.url + self.article1.slug + "/",
@@ -228,6 +318,129 @@ class UserArticleViewSet(TestCase):
         )
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
 
+    @override_settings(JSON_UPLOAD_MAX_BYTES=1024, JSON_UPLOAD_MAX_DEPTH=4, JSON_UPLOAD_MAX_KEYS=20)
+    def test_upload_limits(self):
+        response = self.client.post(
+            path=self.url,
+            data={"title": "too large", "json_body": {"body": "x" * 2048}},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+
+        response = self.client.post(
+            path=self.url,
+            data={"title": "too deep", "json_body": {"a": {"b": {"c": {"d": 1}}}}},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.post(
+            path=self.url,
+            data={"title": "too many keys", "json_body": {str(i): i for i in range(30)}},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.post(
+            path=self.url,
+            data={"title": "in limits", "json_body": {"body": "{[:]}", "a": {"b": 1}}},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        response = self.client.post(
+            path=self.url,
+            data={"title": "too deep form", "json_body": json.dumps({"a": {"b": {"c": {"d": 1}}}})},
+            format="multipart",
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.post(
+            path=self.url,
+            data={"title": "too many keys form", "json_body": json.dumps({str(i): i for i in range(30)})},
+            format="multipart",
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.post(
+            path=self.url,
+            data={"title": "in limits form", "json_body": json.dumps({"a": {"b": 1}})},
+            format="multipart",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_unterminated_string_is_linear(self):
+        data = b'{"a": "' + b'\\"' * (512 * 1024)
+        started = time.monotonic()
+        with self.assertRaises(ParseError):
+            check_structure(data, 32, 10000)
+        self.assertLess(time.monotonic() - started, 1)
+
+    @override_settings(ARTICLE_JSON_BODY_SCHEMA={
+        "type": "object",
+        "properties": {"body": {"type": "string"}},
+        "required": ["body"],
+    })
+    def test_json_body_schema(self):
+        response = self.client.post(
+            path=self.url,
+            data={"title": "invalid body", "json_body": {"body": 1}},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("json_body", response.data)
+
+        response = self.client.post(
+            path=self.url,
+            data={"title": "valid body", "json_body": {"body": "body"}},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_partial_update_article(self):
+        article = Article.objects.create(
+            title="patch me",
+            json_body={"body": "body", "category": "news", "meta": {"a": 1, "b": 2}},
+            is_active=True,
+            user=self.user,
+        )
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(
+                path=self.url + article.slug + "/",
+                data={"json_body": {"category": None, "meta": {"b": 3}}},
+                format="json",
+            )
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data["json_body"], {"body": "body", "meta": {"a": 1, "b": 3}})
+        self.assertEqual(response.data["slug"], article.slug)
+        update = [query["sql"] for query in queries if query["sql"].startswith("UPDATE")]
+        self.assertEqual(len(update), 1)
+        self.assertNotIn('"title"', update[0])
+        self.assertNotIn('"slug"', update[0])
+
+        article.refresh_from_db()
+        self.assertFalse(article.is_active)
+        self.assertIsNone(article.json_category)
+
+        response = self.client.patch(
+            path=self.url + article.slug + "/",
+            data='{"title": "patched"}',
+            content_type="application/merge-patch+json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data["title"], "patched")
+        self.assertNotEqual(response.data["slug"], article.slug)
+
+        events = ArticleEvent.objects.count()
+        response = self.client.patch(
+            path=self.url + response.data["slug"] + "/",
+            data={"title": "patched"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(ArticleEvent.objects.count(), events)
+
     def test_destroy_article(self):
         article_id = self.article3.id
 
@@ -340,4 +553,602 @@ class AdminArticleViewSetTestCase(TestCase):
             path=self.articles_url,
             format="json",
         )
-        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
\ No newline at end of file
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class ArticleOutboxTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.super_user = User.objects.create_superuser(username="testsuperuser", password="passtest")
+        self.key = "Token " + Token.objects.create(user=self.super_user).key
+        self.url = "/user-article/"
+        self.client.credentials(HTTP_AUTHORIZATION=self.key)
+        handled_events.clear()
+
+    def test_events_recorded(self):
+        response = self.client.post(
+            path=self.url,
+            data={"title": "outbox", "json_body": {"body": "body"}},
+            format="json",
+        )
+        slug = response.data["slug"]
+        self.client.put(
+            path=self.url + slug + "/",
+            data={"title": "outbox", "json_body": {"body": "changed"}},
+            format="json",
+        )
+        self.client.post(
+            path="/admin-article/%s/active_article/" % slug,
+            data={"is_active": True},
+            format="json",
+        )
+        self.client.delete(path=self.url + slug + "/")
+
+        self.assertEqual(
+            list(ArticleEvent.objects.values_list("kind", flat=True)),
+            ["created", "updated", "activated", "deleted"],
+        )
+
+    @override_settings(ARTICLE_OUTBOX_HANDLERS=["api_app.tests.record_event_handler"])
+    def test_drain(self):
+        article = Article.objects.create(
+            title="outbox", json_body={"body": "body"}, user=self.super_user
+        )
+        for _ in range(3):
+            outbox.record(article, ArticleEvent.Kind.UPDATED)
+
+        self.assertEqual(outbox.drain(batch_size=2), (2, 0))
+        call_command("process_outbox", once=True, stdout=StringIO())
+
+        self.assertEqual(len(handled_events), 3)
+        self.assertFalse(ArticleEvent.objects.filter(processed_at__isnull=True).exists())
+        self.assertEqual(outbox.drain(), (0, 0))
+
+    @override_settings(ARTICLE_OUTBOX_HANDLERS=["api_app.tests.failing_event_handler"])
+    def test_drain_failed(self):
+        article = Article.objects.create(
+            title="outbox", json_body={"body": "body"}, user=self.super_user
+        )
+        event = outbox.record(article, ArticleEvent.Kind.CREATED)
+
+        with self.assertLogs("api_app.outbox", level="ERROR"):
+            self.assertEqual(outbox.drain(), (0, 1))
+        event.refresh_from_db()
+        self.assertIsNone(event.processed_at)
+        self.assertEqual(event.attempts, 1)
+        self.assertGreater(event.retry_at, timezone.now())
+        # not retried before its backoff.
+        self.assertEqual(outbox.drain(), (0, 0))
+
+    @override_settings(ARTICLE_OUTBOX_HANDLERS=["api_app.tests.database_failing_event_handler"])
+    def test_drain_database_error(self):
+        article = Article.objects.create(
+            title="outbox", json_body={"body": "body"}, user=self.super_user
+        )
+        event = outbox.record(article, ArticleEvent.Kind.CREATED)
+
+        with self.assertLogs("api_app.outbox", level="ERROR"):
+            self.assertEqual(outbox.drain(), (0, 1))
+        event.refresh_from_db()
+        self.assertEqual(event.attempts, 1)
+        self.assertIsNotNone(event.retry_at)
+        # writes of the failed handler are rolled back with its savepoint.
+        self.assertFalse(User.objects.filter(username=f"handler{event.pk}").exists())
+
+    @override_settings(
+        ARTICLE_OUTBOX_HANDLERS=["api_app.tests.rejected_failing_event_handler"],
+        ARTICLE_OUTBOX_MAX_ATTEMPTS=2,
+        ARTICLE_OUTBOX_RETRY_SECONDS=0,
+    )
+    def test_failed_events_do_not_block(self):
+        article = Article.objects.create(
+            title="outbox", json_body={"body": "body"}, user=self.super_user
+        )
+        for _ in range(2):
+            outbox.record(article, ArticleEvent.Kind.REJECTED)
+        updated = outbox.record(article, ArticleEvent.Kind.UPDATED)
+
+        with self.assertLogs("api_app.outbox", level="ERROR") as logs:
+            self.assertEqual(outbox.drain(batch_size=2), (0, 2))
+            self.assertEqual(outbox.drain(batch_size=2), (0, 2))
+        self.assertIn("it is not retried", logs.output[-1])
+
+        self.assertEqual(outbox.drain(batch_size=2), (1, 0))
+        self.assertEqual(handled_events, [updated.pk])
+        self.assertEqual(
+            ArticleEvent.objects.filter(processed_at__isnull=True, attempts=2).count(), 2
+        )
+
+
+
+class RequestCoalescingTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.super_user = User.objects.create_superuser(username="testsuperuser", password="passtest")
+        self.key = "Token " + Token.objects.create(user=self.super_user).key
+        self.metrics_url = "/admin-metrics/coalescing/"
+
+    def test_single_flight(self):
+        flight = SingleFlight()
+        started, release = threading.Event(), threading.Event()
+        calls, results = [], []
+
+        def compute():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return "rendered"
+
+        leader = threading.Thread(target=lambda: results.append(flight.do("key", compute)))
+        leader.start()
+        started.wait(5)
+        followers = [
+            threading.Thread(target=lambda: results.append(flight.do("key", compute)))
+            for _ in range(4)
+        ]
+        for thread in followers:
+            thread.start()
+        while flight.stats()["requests"] < 5:
+            pass
+        release.set()
+        for thread in [leader, *followers]:
+            thread.join(5)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(sorted(results), [("rendered", False)] + [("rendered", True)] * 4)
+        self.assertEqual(flight.stats()["ratio"], 0.8)
+
+        self.assertEqual(flight.do("key", lambda: "again"), ("again", False))
+
+    def test_only_anonymous_json_coalesced(self):
+        requests = article_reads.stats()["requests"]
+        self.client.get(path="/articles/", HTTP_ACCEPT="text/html")
+        self.client.get(path="/articles/", HTTP_COOKIE="sessionid=abc")
+        self.client.get(path="/articles/", HTTP_AUTHORIZATION=self.key)
+        self.assertEqual(article_reads.stats()["requests"], requests)
+
+        self.client.get(path="/articles/")
+        self.client.get(path="/articles/", HTTP_ACCEPT="application/json")
+        self.assertEqual(article_reads.stats()["requests"], requests + 2)
+
+    def test_metrics(self):
+        self.client.get(path="/articles/", format="json")
+
+        response = self.client.get(path=self.metrics_url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        self.client.credentials(HTTP_AUTHORIZATION=self.key)
+        response = self.client.get(path=self.metrics_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertGreaterEqual(response.data["requests"], 1)
+        self.assertIn("ratio", response.data)
+
+
+class ProfilingTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.super_user = User.objects.create_superuser(username="testsuperuser", password="passtest")
+        self.user = User.objects.create_user(username="testuser", password="passtest")
+        self.super_key = "Token " + Token.objects.create(user=self.super_user).key
+        self.key = "Token " + Token.objects.create(user=self.user).key
+        self.profile_url = "/admin-metrics/profile/"
+        request_profile.clear()
+
+    def test_stack_sampler(self):
+        profile = StackProfile()
+
+        def busy_loop():
+            deadline = time.monotonic() + 0.2
+            while time.monotonic() < deadline:
+                pass
+
+        with StackSampler(profile, 0.001):
+            busy_loop()
+
+        stats = profile.stats()
+        self.assertEqual(stats["requests"], 1)
+        self.assertGreater(stats["samples"], 0)
+        self.assertTrue(any("busy_loop" in item["stack"] for item in stats["stacks"]))
+
+    @override_settings(PROFILING_HEADER="X-Profile")
+    def test_profile_endpoint(self):
+        self.client.get(path="/articles/")
+        self.client.get(path="/articles/", HTTP_X_PROFILE="1")
+        self.client.get(path="/articles/", HTTP_X_PROFILE="1", HTTP_AUTHORIZATION=self.key)
+        self.client.get(path="/articles/", HTTP_X_PROFILE="1", HTTP_AUTHORIZATION="Token invalid")
+        self.assertEqual(request_profile.stats()["requests"], 0)
+        self.client.get(path="/articles/", HTTP_X_PROFILE="1", HTTP_AUTHORIZATION=self.super_key)
+        request_profile.add("api_app.views.list;api_app.models.save")
+
+        self.client.credentials(HTTP_AUTHORIZATION=self.key)
+        response = self.client.get(path=self.profile_url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.credentials(HTTP_AUTHORIZATION=self.super_key)
+        response = self.client.get(path=self.profile_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["requests"], 1)
+        self.assertGreaterEqual(response.data["samples"], 1)
+
+        response = self.client.get(path=self.profile_url, data={"format": "collapsed"})
+        self.assertEqual(response["Content-Type"], "text/plain; charset=utf-8")
+        self.assertIn("api_app.views.list;api_app.models.save 1\n", response.content.decode())
+
+        response = self.client.delete(path=self.profile_url)
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(request_profile.stats()["samples"], 0)
+
+    def test_middleware_not_used_when_off(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            ProfilingMiddleware(lambda request: None)
+        with override_settings(SLOW_QUERY_MS=100):
+            ProfilingMiddleware(lambda request: None)
+
+    @override_settings(SLOW_QUERY_MS=0)
+    def test_slow_query_log(self):
+        with self.assertLogs("api_app.profiling", "WARNING") as logs:
+            self.client.get(path="/articles/")
+        self.assertIn("Slow query", logs.output[0])
+        self.assertIn("api_app_article", logs.output[0])
+        # sqlite "EXPLAIN QUERY PLAN" rows
+        self.assertRegex(logs.output[0], "SCAN|SEARCH")
+
+
+class ModerationQueueTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.moderator1 = User.objects.create_superuser(username="moderator1", password="passtest")
+        self.key1 = "Token " + Token.objects.create(user=self.moderator1).key
+        self.moderator2 = User.objects.create_superuser(username="moderator2", password="passtest")
+        self.key2 = "Token " + Token.objects.create(user=self.moderator2).key
+        self.user = User.objects.create_user(username="testuser", password="passtest")
+        self.key3 = "Token " + Token.objects.create(user=self.user).key
+        self.queue_url = "/admin-article/queue/"
+        self.claim_url = "/admin-article/claim/"
+        self.moderate_url = "/admin-article/moderate/"
+        self.client.credentials(HTTP_AUTHORIZATION=self.key1)
+        now = timezone.now()
+        for i in range(10):
+            setattr(
+                self,
+                f"article{i}",
+                Article.objects.create(
+                    title=f"article{i}",
+                    json_body={"body": "body"},
+                    pub_date=now - timezone.timedelta(days=10 - i),
+                    is_active=i % 2 == 0,
+                    user=self.user,
+                ),
+            )
+
+    def test_queue(self):
+        response = self.client.get(path=self.queue_url, data={"limit": 3})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [article["slug"] for article in response.data["results"]],
+            [self.article1.slug, self.article3.slug, self.article5.slug],
+        )
+
+        response = self.client.get(
+            path=self.queue_url, data={"limit": 3, "cursor": response.data["next"]}
+        )
+        self.assertEqual(
+            [article["slug"] for article in response.data["results"]],
+            [self.article7.slug, self.article9.slug],
+        )
+        self.assertIsNone(response.data["next"])
+
+        response = self.client.get(path=self.queue_url, data={"cursor": "invalid"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.client.credentials(HTTP_AUTHORIZATION=self.key3)
+        response = self.client.get(path=self.queue_url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_claim(self):
+        response = self.client.post(path=self.claim_url, data={"limit": 2}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [article["slug"] for article in response.data],
+            [self.article1.slug, self.article3.slug],
+        )
+
+        self.client.credentials(HTTP_AUTHORIZATION=self.key2)
+        response = self.client.post(path=self.claim_url, data={"limit": 2}, format="json")
+        self.assertEqual(
+            [article["slug"] for article in response.data],
+            [self.article5.slug, self.article7.slug],
+        )
+
+        Article.objects.filter(claimed_by=self.moderator1).update(
+            claimed_until=timezone.now() - timezone.timedelta(seconds=1)
+        )
+        response = self.client.post(path=self.claim_url, data={"limit": 3}, format="json")
+        self.assertEqual(
+            [article["slug"] for article in response.data],
+            [self.article1.slug, self.article3.slug, self.article5.slug],
+        )
+
+    def test_moderate(self):
+        self.client.post(path=self.claim_url, data={"limit": 1}, format="json")
+
+        self.client.credentials(HTTP_AUTHORIZATION=self.key2)
+        response = self.client.post(
+            path=self.moderate_url,
+            data={
+                "approve": [self.article1.slug, self.article3.slug],
+                "reject": [self.article5.slug],
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data, {"approved": 1, "rejected": 1})
+
+        self.assertFalse(Article.objects.get(id=self.article1.id).is_active)
+        self.assertTrue(Article.objects.get(id=self.article3.id).is_active)
+        self.assertIsNotNone(Article.objects.get(id=self.article5.id).rejected_at)
+        self.assertEqual(
+            list(Article.objects.pending().values_list("id", flat=True)),
+            [self.article1.id, self.article7.id, self.article9.id],
+        )
+        self.assertEqual(
+            sorted(ArticleEvent.objects.values_list("kind", flat=True)),
+            ["activated", "rejected"],
+        )
+
+
+class BootProfileTestCase(TestCase):
+    def test_lazy_docs_view(self):
+        response = self.client.get(path="/swagger-ui/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_boot_report(self):
+        stdout = StringIO()
+        call_command("boot_report", profile="api", top=3, stdout=stdout)
+        lines = stdout.getvalue().splitlines()
+
+        self.assertTrue(lines[0].startswith("api: imports"))
+        self.assertEqual(len(lines), 4)
+        self.assertNotIn("drf_spectacular", stdout.getvalue())
+
+    def test_api_boot_skips_jsonschema(self):
+        script = (
+            "import sys\n"
+            "from django.urls import get_resolver\n"
+            "from core.asgi import application\n"
+            "get_resolver().url_patterns\n"
+            "print('jsonschema' in sys.modules)\n"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", script],
+            cwd=settings.BASE_DIR,
+            env=dict(os.environ, DJANGO_API_ONLY="1", DJANGO_SETTINGS_MODULE="core.settings"),
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        self.assertEqual(result.stdout.strip(), "False")
+
+
+
+class SchemaTestCase(TestCase):
+    def test_schema_not_drifted(self):
+        with redirect_stderr(StringIO()):
+            call_command("check_schema", stdout=StringIO())
+
+    def test_schema_etag(self):
+        response = self.client.get(path="/schema/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn(b"openapi: 3.0.3", response.content)
+        etag = response["ETag"]
+
+        response = self.client.get(path="/schema/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        response = self.client.get(path="/schema/", data={"format": "json"})
+        self.assertEqual(response.json()["openapi"], "3.0.3")
+        parameters = response.json()["paths"]["/articles/"]["get"]["parameters"]
+        self.assertEqual(
+            {parameter["name"] for parameter in parameters},
+            {"category", "language", "author"},
+        )
+        self.assertNotEqual(response["ETag"], etag)
+
+        response = self.client.post(path="/schema/")
+        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+
+class ArticleArchiveTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username="testuser", password="passtest")
+        self.key = "Token " + Token.objects.create(user=self.user).key
+        now = timezone.now()
+        for i, days in enumerate([1, 400, 500]):
+            setattr(
+                self,
+                f"article{i}",
+                Article.objects.create(
+                    title=f"article{i}",
+                    json_body={"body": "body"},
+                    pub_date=now - timezone.timedelta(days=days),
+                    is_active=True,
+                    user=self.user,
+                ),
+            )
+        self.pending = Article.objects.create(
+            title="pending",
+            json_body={"body": "body"},
+            pub_date=now - timezone.timedelta(days=600),
+            user=self.user,
+        )
+
+    def test_roll_articles(self):
+        stdout = StringIO()
+        call_command("roll_articles", batch_size=1, stdout=stdout)
+
+        self.assertIn("2 articles", stdout.getvalue())
+        self.assertEqual(
+            set(Article.objects.values_list("id", flat=True)),
+            {self.article0.id, self.pending.id},
+        )
+        self.assertEqual(
+            set(ArchivedArticle.objects.values_list("slug", flat=True)),
+            {self.article1.slug, self.article2.slug},
+        )
+        self.assertEqual(ArticleEvent.objects.filter(kind="archived").count(), 2)
+
+    def test_archive_fallback(self):
+        call_command("roll_articles", stdout=StringIO())
+
+        response = self.client.get(path="/articles/")
+        self.assertEqual(len(response.data), 1)
+
+        response = self.client.get(path="/articles/" + self.article1.slug + "/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["id"], self.article1.id)
+        self.assertEqual(response.data["title"], self.article1.title)
+
+        self.client.credentials(HTTP_AUTHORIZATION=self.key)
+        response = self.client.get(path="/user-article/" + self.article2.slug + "/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response = self.client.get(path="/user-article/")
+        self.assertEqual(len(response.data), 2)
+
+        response = self.client.get(path="/articles/invalid-slug/")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_owner_archived_articles(self):
+        call_command("roll_articles", stdout=StringIO())
+        self.client.credentials(HTTP_AUTHORIZATION=self.key)
+
+        response = self.client.get(path="/user-article/", data={"archived": "1"})
+        self.assertEqual(
+            {article["slug"] for article in response.data},
+            {self.article1.slug, self.article2.slug},
+        )
+
+        response = self.client.delete(path="/user-article/" + self.article1.slug + "/")
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(ArchivedArticle.objects.filter(id=self.article1.id).exists())
+        self.assertEqual(ArticleEvent.objects.filter(kind="deleted").count(), 1)
+
+        response = self.client.get(path="/user-article/", data={"archived": "1"})
+        self.assertEqual(len(response.data), 1)
+
+
+class BulkImportExportTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", password="passtest")
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "articles.ndjson")
+        self.checkpoint = os.path.join(self.tmp.name, "checkpoint.json")
+        for i in range(10):
+            Article.objects.create(
+                title=f"article{i}",
+                json_body={"body": i},
+                is_active=i % 2 == 0,
+                user=self.user,
+            )
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_export_import(self):
+        articles = list(Article.objects.order_by("id").values("title", "json_body", "pub_date", "is_active", "slug", "user"))
+        call_command("export_articles", self.path, chunk_size=3, stderr=StringIO())
+        with open(self.path) as f:
+            self.assertEqual(len(f.readlines()), 10)
+
+        Article.objects.all().delete()
+        with open(self.path, "a") as f:
+            f.write('{"title": ""}\n')
+            f.write("not json\n")
+            f.write('{"title": "b", "json_body": {}}\n')
+            f.write('{"title": "b", "json_body": {}, "pub_date": "2025-01-01T00:00:00Z", "user": "abc"}\n')
+            f.write('{"title": "b", "json_body": {}, "pub_date": "2025-01-01T00:00:00Z", "user": [1]}\n')
+
+        stdout, stderr = StringIO(), StringIO()
+        call_command("import_articles", self.path, workers=2, batch_size=4, stdout=stdout, stderr=stderr)
+        self.assertIn("10 articles imported, 5 failed", stdout.getvalue())
+        self.assertIn("line 11:", stderr.getvalue())
+        self.assertIn("line 13: pub_date is required.", stderr.getvalue())
+        self.assertIn("line 14: user should be a positive integer.", stderr.getvalue())
+        self.assertIn("line 15: user should be a positive integer.", stderr.getvalue())
+        self.assertEqual(
+            list(Article.objects.order_by("pub_date").values("title", "json_body", "pub_date", "is_active", "slug", "user")),
+            articles,
+        )
+
+    def test_import_resume(self):
+        call_command("export_articles", self.path, checkpoint=self.checkpoint, stderr=StringIO())
+        with open(self.checkpoint) as f:
+            self.assertEqual(json.load(f)["id"], Article.objects.order_by("id").last().id)
+
+        Article.objects.all().delete()
+        with open(self.checkpoint, "w") as f:
+            json.dump({"line": 4}, f)
+
+        stdout = StringIO()
+        call_command("import_articles", self.path, checkpoint=self.checkpoint, stdout=stdout)
+        self.assertIn("resuming after line 4", stdout.getvalue())
+        self.assertEqual(Article.objects.count(), 6)
+
+        # importing the same lines again does not duplicate them.
+        os.remove(self.checkpoint)
+        stdout = StringIO()
+        call_command("import_articles", self.path, stdout=stdout)
+        self.assertIn("4 articles imported", stdout.getvalue())
+        self.assertEqual(Article.objects.count(), 10)
+        self.assertEqual(ArticleEvent.objects.filter(kind="created").count(), 10)
+
+    def test_import_archived(self):
+        for article in Article.objects.all():
+            article.pub_date -= timezone.timedelta(days=400)
+            article.is_active = True
+            article.save()
+        call_command("roll_articles", stdout=StringIO())
+        call_command("export_articles", self.path, archived=True, stderr=StringIO())
+
+        # the archived articles are not imported into the hot table again.
+        stdout = StringIO()
+        call_command("import_articles", self.path, stdout=stdout)
+        self.assertRegex(stdout.getvalue(), r"(?m)^0 articles imported")
+        self.assertEqual(Article.objects.count(), 0)
+
+        ArchivedArticle.objects.all().delete()
+        stdout = StringIO()
+        call_command("import_articles", self.path, archived=True, stdout=stdout)
+        self.assertIn("10 articles imported", stdout.getvalue())
+        self.assertEqual(ArchivedArticle.objects.count(), 10)
+        self.assertEqual(Article.objects.count(), 0)
+        self.assertEqual(ArticleEvent.objects.filter(kind="created").count(), 10)
+
+
+class RunWorkersTestCase(SimpleTestCase):
+    # /schema/ is served from memory, the workers do not touch a database.
+    def get(self, port):
+        connection = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+        connection.request("GET", "/schema/")
+        return connection.getresponse().status
+
+    def test_runworkers(self):
+        server = subprocess.Popen(
+            [sys.executable, "manage.py", "runworkers", "--port", "0", "--workers", "2", "-v", "0"],
+            cwd=settings.BASE_DIR,
+            stdout=subprocess.PIPE,
+            text=True,
+        )
+        try:
+            port = int(server.stdout.readline().split(":")[1].split()[0])
+            self.assertEqual(server.stdout.readline().strip(), "Workers are ready.")
+            self.assertEqual(self.get(port), status.HTTP_200_OK)
+
+            server.send_signal(signal.SIGHUP)
+            self.assertEqual(server.stdout.readline().strip(), "Reloading workers.")
+            self.assertEqual(server.stdout.readline().strip(), "Workers are ready.")
+            self.assertEqual(self.get(port), status.HTTP_200_OK)
+        finally:
+            server.terminate()
+            self.assertEqual(server.wait(30), 0)
@@ -7,6 +7,7 @@ router.register(r"token", views.BaseTokenAuthViewSet, basename="token")
 router.register(r"articles", views.ArticleListViewSet, basename="articles")
 router.register(r"user-article", views.UserArticleViewSet, basename="user-article")
 router.register(r"admin-article", views.AdminArticleViewSet, basename="admin-article")
+router.register(r"admin-metrics", views.AdminMetricsViewSet, basename="admin-metrics")
 
 app_name = "api_app"
 
@@ -0,0 +1,45 @@
+import functools
+import json
+
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from rest_framework import serializers
+
+MAX_ERRORS = 10
+
+
+@functools.lru_cache(maxsize=16)
+def get_validator(schema_json):
+    """
+        Compile the json schema once, validators are cached by schema.
+        jsonschema is imported here, workers without a schema do not load it.
+    """
+    from jsonschema.validators import validator_for
+
+    schema = json.loads(schema_json)
+    validator_class = validator_for(schema)
+    validator_class.check_schema(schema)
+    return validator_class(schema)
+
+
+def validate_json_body(value):
+    """
+        Validate json_body by settings.ARTICLE_JSON_BODY_SCHEMA, if it is set.
+    """
+    schema = getattr(settings, "ARTICLE_JSON_BODY_SCHEMA", None)
+    if not schema:
+        return value
+
+    validator = get_validator(json.dumps(schema, sort_keys=True))
+    errors = sorted(validator.iter_errors(value), key=lambda error: [str(key) for key in error.path])
+    if errors:
+        raise serializers.ValidationError(
+            [
+                _("%(path)s: %(message)s") % {
+                    "path": "/".join(str(key) for key in error.path) or "json_body",
+                    "message": error.message,
+                }
+                for error in errors[:MAX_ERRORS]
+            ]
+        )
+    return value
@@ -2,18 +2,35 @@ from http import HTTPMethod
 
 from django.utils.translation import gettext_lazy as _
 from django.contrib.auth import authenticate
+from django.http import Http404
+from django.db import transaction
 from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action
+from rest_framework.parsers import FormParser, MultiPartParser
 from rest_framework.authentication import get_authorization_header
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 
-from .models import Article, ExpiredTokenProxy
+from .models import Article, ArchivedArticle, ArticleEvent, ExpiredTokenProxy
 from .serializers import (
     ArticleSerializer,
+    ArchivedArticleSerializer,
     UserLoginSerializer,
-    AdminArticlesSerializer
+    AdminArticlesSerializer,
+    ModerationQueueSerializer,
+    ModerationQuerySerializer,
+    ClaimSerializer,
+    ModerateSerializer,
+    CoalescingStatsSerializer,
+    ProfileSerializer,
 )
 from .authentication import TokenNotExpiredAuth
+from .parsers import LimitedJSONParser, MergePatchJSONParser
+from .renderers import CollapsedStackRenderer
+from .filters import JsonBodyFilter, UserArticleFilter
+from .coalescing import CoalescedReadMixin, article_reads
+from .profiling import request_profile
+from . import caching, moderation, outbox
 
 
 class BaseTokenAuthViewSet(viewsets.ViewSet):
@@ -94,13 +111,33 @@ class BaseTokenAuthViewSet(viewsets.ViewSet):
         return Response({"Token": "Token " + token.key})
 
 
-class ArticleListViewSet(viewsets.ReadOnlyModelViewSet):
+class ArticleListViewSet(CoalescedReadMixin, viewsets.ReadOnlyModelViewSet):
+    """
+        Published articles, the list can be filtered by
+        category, language and author keys of json_body.
+    """
     serializer_class = ArticleSerializer
     lookup_field = "slug"
 
+    filter_backends = [JsonBodyFilter]
+
     def get_queryset(self):
         return Article.objects.published()
 
+    def retrieve(self, request, *args, **kwargs):
+        """
+            Old articles are not in the hot table, look them up in the archive.
+        """
+        try:
+            return super().retrieve(request, *args, **kwargs)
+        except Http404:
+            article = ArchivedArticle.objects.published().filter(
+                slug=kwargs[self.lookup_field]
+            ).first()
+            if article is None:
+                raise
+            return Response(ArchivedArticleSerializer(article).data)
+
 
 def get_user_from_token(request) -> tuple:
     """
@@ -120,17 +157,39 @@ class UserArticleViewSet(viewsets.ViewSet):
     serializer_class = ArticleSerializer
     authentication_classes = [TokenNotExpiredAuth]
     permission_classes = [permissions.IsAuthenticated]
+    filter_backends = [UserArticleFilter]
+    parser_classes = [
+        LimitedJSONParser,
+        MergePatchJSONParser,
+        FormParser,
+        MultiPartParser,
+    ]
     lookup_field = 'slug'
 
     def list(self, request, format=True):
+        """
+            Articles of the user, ?archived=1 lists the archived ones,
+            they can not be filtered by json_body keys.
+        """
         response, user = get_user_from_token(request)
 
         if response:
             return response
 
-        queryset = self.model.objects.filter(user=user)
-        serializer = self.serializer_class(queryset, many=True)
-        return Response(serializer.data)
+        archived = request.query_params.get("archived") in ("1", "true")
+
+        def serialize():
+            if archived:
+                queryset = ArchivedArticle.objects.filter(user=user)
+                return ArchivedArticleSerializer(queryset, many=True).data
+            queryset = self.model.objects.filter(user=user)
+            for backend in self.filter_backends:
+                queryset = backend().filter_queryset(request, queryset, self)
+            return self.serializer_class(queryset, many=True).data
+
+        return Response(
+            caching.get_or_set_list(user.id, request.query_params, serialize)
+        )
 
     def create(self, request, format=None):
         response, user = get_user_from_token(request)
@@ -138,10 +197,14 @@ class UserArticleViewSet(viewsets.ViewSet):
         if response:
             return response
 
+        # parsing errors (size and structure limits) are not 404.
+        data = request.data
         try:
-            serializer = self.serializer_class(data=request.data)
+            serializer = self.serializer_class(data=data)
             if serializer.is_valid():
-                serializer.save(user=user)
+                with transaction.atomic():
+                    article = serializer.save(user=user)
+                    outbox.record(article, ArticleEvent.Kind.CREATED)
                 return Response(serializer.data, status=status.HTTP_201_CREATED)
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         except:
@@ -157,25 +220,46 @@ class UserArticleViewSet(viewsets.ViewSet):
             article = self.model.objects.get(slug=slug, user=user)
             serializer = self.serializer_class(article)
             return Response(serializer.data)
+        except self.model.DoesNotExist:
+            pass
         except:
             return Response(status=status.HTTP_404_NOT_FOUND)
 
-    def update(self, request, slug, format=None):
+        try:
+            article = ArchivedArticle.objects.get(slug=slug, user=user)
+            serializer = ArchivedArticleSerializer(article)
+            return Response(serializer.data)
+        except:
+            return Response(status=status.HTTP_404_NOT_FOUND)
+
+    def update(self, request, slug, format=None, partial=False):
         response, user = get_user_from_token(request)
 
         if response:
             return response
 
+        data = request.data
         try:
             article = self.model.objects.get(slug=slug, user=user)
-            serializer = self.serializer_class(article, data=request.data)
+            serializer = self.serializer_class(article, data=data, partial=partial)
             if serializer.is_valid():
-                serializer.save()
+                with transaction.atomic():
+                    article = serializer.save()
+                    # nothing is written when nothing changed, so no event.
+                    if serializer.changed_fields:
+                        outbox.record(article, ArticleEvent.Kind.UPDATED)
                 return Response(serializer.data, status=status.HTTP_202_ACCEPTED)
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         except:
             return Response(status=status.HTTP_404_NOT_FOUND)
 
+    def partial_update(self, request, slug, format=None):
+        """
+            Only given fields are changed,
+            json_body is merged with JSON merge patch (null removes a key).
+        """
+        return self.update(request, slug, format, partial=True)
+
     def destroy(self, request, slug, format=None):
         response, user = get_user_from_token(request)
 
@@ -183,8 +267,13 @@ class UserArticleViewSet(viewsets.ViewSet):
             return Response
 
         try:
-            article = Article.objects.get(slug=slug, user=user)
-            article.delete()
+            article = (
+                Article.objects.filter(slug=slug, user=user).first()
+                or ArchivedArticle.objects.get(slug=slug, user=user)
+            )
+            with transaction.atomic():
+                outbox.record(article, ArticleEvent.Kind.DELETED)
+                article.delete()
             return Response(status=status.HTTP_204_NO_CONTENT)
         except:
             return Response(status=status.HTTP_404_NOT_FOUND)
@@ -224,8 +313,142 @@ class AdminArticleViewSet(viewsets.ViewSet):
             article = Article.objects.get(slug=slug)
             serializer = self.serializer_class(article, data=request.data)
             if serializer.is_valid():
-                serializer.save()
+                with transaction.atomic():
+                    article = serializer.save()
+                    outbox.record(
+                        article,
+                        ArticleEvent.Kind.ACTIVATED
+                        if article.is_active else ArticleEvent.Kind.UPDATED,
+                    )
                 return Response(status=status.HTTP_202_ACCEPTED)
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         except:
-            return Response(status=status.HTTP_404_NOT_FOUND)
\ No newline at end of file
+            return Response(status=status.HTTP_404_NOT_FOUND)
+
+    @action(
+        detail=False,
+        methods=[HTTPMethod.GET],
+        serializer_class=ModerationQueueSerializer,
+    )
+    def queue(self, request, format=None):
+        """
+            Pending articles oldest first, with keyset pagination,
+            pass the returned "next" as ?cursor= to get the next page.
+        """
+        response, user = get_user_from_token(request)
+
+        if response:
+            return response
+        if not user.is_superuser:
+            return Response(status=status.HTTP_403_FORBIDDEN)
+
+        query = ModerationQuerySerializer(data=request.query_params)
+        if not query.is_valid():
+            return Response(query.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            articles, cursor = moderation.queue_page(
+                query.validated_data.get("cursor"),
+                query.validated_data["limit"],
+            )
+        except ValueError:
+            return Response(
+                {"cursor": _("Invalid cursor.")},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        serializer = self.serializer_class(articles, many=True)
+        return Response({"results": serializer.data, "next": cursor})
+
+    @action(detail=False, methods=[HTTPMethod.POST], serializer_class=ClaimSerializer)
+    def claim(self, request, format=None):
+        """
+            Lease the oldest pending articles to this moderator,
+            other moderators do not get them until the lease is expired.
+        """
+        response, user = get_user_from_token(request)
+
+        if response:
+            return response
+        if not user.is_superuser:
+            return Response(status=status.HTTP_403_FORBIDDEN)
+
+        serializer = self.serializer_class(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        articles = moderation.claim(user, serializer.validated_data["limit"])
+        return Response(ModerationQueueSerializer(articles, many=True).data)
+
+    @action(detail=False, methods=[HTTPMethod.POST], serializer_class=ModerateSerializer)
+    def moderate(self, request, format=None):
+        """
+            Approve and reject a batch of pending articles by slug.
+        """
+        response, user = get_user_from_token(request)
+
+        if response:
+            return response
+        if not user.is_superuser:
+            return Response(status=status.HTTP_403_FORBIDDEN)
+
+        serializer = self.serializer_class(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        result = moderation.moderate(
+            user,
+            serializer.validated_data["approve"],
+            serializer.validated_data["reject"],
+        )
+        return Response(result, status=status.HTTP_202_ACCEPTED)
+
+
+class AdminMetricsViewSet(viewsets.ViewSet):
+    """
+        Process level metrics, only for superusers.
+    """
+    serializer_class = CoalescingStatsSerializer
+    authentication_classes = [TokenNotExpiredAuth]
+    permission_classes = [permissions.IsAuthenticated]
+
+    @action(detail=False, methods=[HTTPMethod.GET])
+    def coalescing(self, request, format=None):
+        """
+            Request coalescing stats of the public article endpoints,
+            ratio is the part of requests that shared another request result.
+        """
+        response, user = get_user_from_token(request)
+
+        if response:
+            return response
+        if not user.is_superuser:
+            return Response(status=status.HTTP_403_FORBIDDEN)
+
+        serializer = self.serializer_class(article_reads.stats())
+        return Response(serializer.data)
+
+    @action(
+        detail=False,
+        methods=[HTTPMethod.GET, HTTPMethod.DELETE],
+        serializer_class=ProfileSerializer,
+        renderer_classes=[*api_settings.DEFAULT_RENDERER_CLASSES, CollapsedStackRenderer],
+    )
+    def profile(self, request, format=None):
+        """
+            Stack samples of the profiled requests of this process, most common first,
+            ?format=collapsed returns them as flame graph input, DELETE clears them.
+        """
+        response, user = get_user_from_token(request)
+
+        if response:
+            return response
+        if not user.is_superuser:
+            return Response(status=status.HTTP_403_FORBIDDEN)
+
+        if request.method == HTTPMethod.DELETE:
+            request_profile.clear()
+            return Response(status=status.HTTP_204_NO_CONTENT)
+
+        serializer = self.serializer_class(request_profile.stats())
+        return Response(serializer.data)
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -27,6 +28,12 @@ DEBUG = True
 
 ALLOWED_HOSTS = []
 
+# API-only runtime profile, for workers that only serve token authenticated api.
+# It drops admin, sessions, messages, static files, csrf and schema views,
+# so boot time and per-worker memory are smaller.
+# "python manage.py boot_report" compares both profiles.
+API_ONLY = os.environ.get("DJANGO_API_ONLY", "").lower() in ("1", "true", "yes")
+
 
 # Application definition
 
@@ -44,8 +51,18 @@ INSTALLED_APPS = [
     'drf_spectacular_sidecar',
     'api_app',
 ]
+if API_ONLY:
+    INSTALLED_APPS = [
+        "daphne",
+        'django.contrib.auth',
+        'django.contrib.contenttypes',
+        'rest_framework',
+        'rest_framework.authtoken',
+        'api_app',
+    ]
 
 MIDDLEWARE = [
+    "api_app.profiling.ProfilingMiddleware",
     "django.middleware.gzip.GZipMiddleware",
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -55,6 +72,13 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
+if API_ONLY:
+    MIDDLEWARE = [
+        "api_app.profiling.ProfilingMiddleware",
+        "django.middleware.gzip.GZipMiddleware",
+        'django.middleware.security.SecurityMiddleware',
+        'django.middleware.common.CommonMiddleware',
+    ]
 
 ROOT_URLCONF = 'core.urls'
 
@@ -88,6 +112,40 @@ DATABASES = {
 }
 
 
+# Articles published before this many days are moved to the archive table
+# by "python manage.py roll_articles".
+
+ARTICLE_ARCHIVE_AFTER_DAYS = 365
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# local memory is per process, use a shared backend (redis, memcached)
+# when running several workers, so version bumps reach every worker.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+# Seconds a user article list stays cached, a change bumps its version anyway.
+USER_ARTICLES_CACHE_TIMEOUT = 60
+
+
+# Limits of json uploads to user articles, checked while the body is read
+# and before it is decoded.
+
+JSON_UPLOAD_MAX_BYTES = 1024 * 1024
+
+JSON_UPLOAD_MAX_DEPTH = 32
+
+JSON_UPLOAD_MAX_KEYS = 10000
+
+# Optional json schema (dict) for Article.json_body, None to accept any json.
+ARTICLE_JSON_BODY_SCHEMA = None
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -109,6 +167,15 @@ AUTH_PASSWORD_VALIDATORS = [
 REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
 }
+if API_ONLY:
+    REST_FRAMEWORK = {
+        'DEFAULT_AUTHENTICATION_CLASSES': [
+            'api_app.authentication.TokenNotExpiredAuth',
+        ],
+        'DEFAULT_RENDERER_CLASSES': [
+            'rest_framework.renderers.JSONRenderer',
+        ],
+    }
 
 SPECTACULAR_SETTINGS = {
     'TITLE': 'drf-sample-api',
@@ -119,6 +186,46 @@ SPECTACULAR_SETTINGS = {
     'SWAGGER_UI_FAVICON_HREF': 'SIDECAR',
     'REDOC_DIST': 'SIDECAR',
 }
+
+# Prebuilt schema served by /schema/, keep it in sync with "python manage.py check_schema".
+SCHEMA_FILE = BASE_DIR / "schema.yml"
+
+
+# Article outbox, drained by "python manage.py process_outbox".
+# Handlers are dotted paths to callables taking one ArticleEvent.
+
+ARTICLE_OUTBOX_HANDLERS = []
+
+ARTICLE_OUTBOX_BATCH_SIZE = 100
+
+# A failed event is retried after ARTICLE_OUTBOX_RETRY_SECONDS, doubled on
+# each failure, and given up after ARTICLE_OUTBOX_MAX_ATTEMPTS.
+ARTICLE_OUTBOX_MAX_ATTEMPTS = 10
+
+ARTICLE_OUTBOX_RETRY_SECONDS = 5
+
+
+# Seconds a moderator keeps the articles claimed from the moderation queue.
+
+MODERATION_LEASE_SECONDS = 300
+
+
+# Opt-in request profiling, stacks are sampled every PROFILING_INTERVAL seconds
+# and served by /admin-metrics/profile/ in collapsed (flame graph) format.
+# PROFILING_HEADER is a request header that turns it on for superuser tokens
+# (None to disable), PROFILING_SAMPLE_RATE is the part of all requests that are profiled.
+# ProfilingMiddleware is not loaded when these and SLOW_QUERY_MS are all off.
+
+PROFILING_HEADER = None
+
+PROFILING_SAMPLE_RATE = 0.0
+
+PROFILING_INTERVAL = 0.005
+
+# Queries slower than this many milliseconds are logged with EXPLAIN, None to disable.
+SLOW_QUERY_MS = None
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.1/topics/i18n/
 
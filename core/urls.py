@@ -1,21 +1,48 @@
 from django.conf import settings
-from django.contrib import admin
 from django.urls import path, include
-from django.views.static import serve
-from drf_spectacular.views import (
-    SpectacularAPIView,
-    SpectacularRedocView,
-    SpectacularSwaggerView
-)
+from django.utils.module_loading import import_string
+
+
+def lazy_view(view_path, **initkwargs):
+    """
+        Import the class based view on its first request,
+        so workers do not import drf_spectacular at boot.
+    """
+    view = None
+
+    def dispatch(request, *args, **kwargs):
+        nonlocal view
+        if view is None:
+            view = import_string(view_path).as_view(**initkwargs)
+        return view(request, *args, **kwargs)
+
+    return dispatch
+
 
 urlpatterns = [
     path("", include("api_app.urls")),
-    path('admin/', admin.site.urls),
-    path('schema/', SpectacularAPIView.as_view(), name='schema'),
-    path('swagger-ui/', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
-    path('redoc/', SpectacularRedocView.as_view(url_name='schema'), name='redoc'),
 ]
-if settings.DEBUG == True:
+if not settings.API_ONLY:
+    from django.contrib import admin
+    from api_app.schema import schema_view
+
+    urlpatterns += [
+        path('admin/', admin.site.urls),
+        path('schema/', schema_view, name='schema'),
+        path(
+            'swagger-ui/',
+            lazy_view("drf_spectacular.views.SpectacularSwaggerView", url_name='schema'),
+            name='swagger-ui',
+        ),
+        path(
+            'redoc/',
+            lazy_view("drf_spectacular.views.SpectacularRedocView", url_name='schema'),
+            name='redoc',
+        ),
+    ]
+if settings.DEBUG == True and not settings.API_ONLY:
+    from django.views.static import serve
+
     urlpatterns += [
         path("static/<path:path>", serve, {"document_root": settings.STATIC_ROOT}),
     ]
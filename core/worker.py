@@ -0,0 +1,127 @@
+"""
+Daphne worker process started by "python manage.py runworkers".
+
+It takes the same arguments as daphne, plus "worker:" endpoints:
+
+    worker:fileno=<inherited socket fd>:family=INET|INET6:tls=0|1
+
+and reads from the environment:
+
+    DAPHNE_KEEPALIVE_TIMEOUT  idle seconds before a keep-alive connection is closed
+    DAPHNE_GRACEFUL_TIMEOUT  seconds to finish open requests after SIGTERM
+    DAPHNE_READY_FD  fd to write to once the worker is listening
+    DAPHNE_TLS_CERT / DAPHNE_TLS_KEY  PEM files, used when tls=1
+    DAPHNE_HTTP2  "0" to not offer HTTP/2 with ALPN on TLS endpoints
+"""
+
+import os
+import signal
+import socket
+import sys
+import time
+
+from daphne import server
+from daphne.cli import CommandLineInterface
+from twisted.internet import defer, reactor
+from twisted.internet.endpoints import serverFromString
+from twisted.web import http
+
+FAMILIES = {"INET": socket.AF_INET, "INET6": socket.AF_INET6}
+
+ports = []
+
+
+class WorkerEndpoint:
+    """
+        Listen on a socket shared by all workers, optionally with TLS,
+        and apply the keep-alive timeout to the daphne http factory.
+    """
+
+    def __init__(self, reactor, description):
+        self.reactor = reactor
+        self.description = description
+
+    def listen(self, factory):
+        timeout = os.environ.get("DAPHNE_KEEPALIVE_TIMEOUT")
+        if timeout:
+            factory.timeOut = float(timeout)
+
+        if not self.description.startswith("worker:"):
+            listener = serverFromString(self.reactor, self.description).listen(factory)
+        else:
+            options = dict(
+                item.split("=", 1)
+                for item in self.description[len("worker:"):].split(":")
+            )
+            if options.get("tls") == "1":
+                factory = self.tls_factory(factory)
+            listener = defer.execute(
+                self.reactor.adoptStreamPort,
+                int(options["fileno"]),
+                FAMILIES[options.get("family", "INET")],
+                factory,
+            )
+        return listener.addCallback(self.listening)
+
+    def listening(self, port):
+        ports.append(port)
+        ready_fd = os.environ.pop("DAPHNE_READY_FD", None)
+        if ready_fd:
+            os.write(int(ready_fd), b"1")
+            os.close(int(ready_fd))
+        return port
+
+    def tls_factory(self, factory):
+        from twisted.internet import ssl
+        from twisted.protocols.tls import TLSMemoryBIOFactory
+
+        with open(os.environ["DAPHNE_TLS_KEY"]) as f:
+            pem = f.read()
+        with open(os.environ["DAPHNE_TLS_CERT"]) as f:
+            pem += f.read()
+        # ALPN offers the protocols of daphne's factory, h2 when it is enabled.
+        return TLSMemoryBIOFactory(
+            ssl.PrivateCertificate.loadPEM(pem).options(), False, factory
+        )
+
+
+class GracefulCommandLineInterface(CommandLineInterface):
+    """
+        On SIGTERM stop accepting, let open requests finish, then stop.
+    """
+
+    def run(self, args):
+        reactor.callWhenRunning(
+            signal.signal, signal.SIGTERM, self.on_terminate
+        )
+        super().run(args)
+
+    def on_terminate(self, signum, frame):
+        reactor.callFromThread(self.drain)
+
+    def drain(self):
+        for port in ports:
+            port.stopListening()
+        timeout = float(os.environ.get("DAPHNE_GRACEFUL_TIMEOUT", 30))
+        self.check_drained(time.monotonic() + timeout)
+
+    def check_drained(self, deadline):
+        busy = any(
+            "disconnected" not in details
+            for details in self.server.connections.values()
+        )
+        if busy and time.monotonic() < deadline:
+            reactor.callLater(0.1, self.check_drained, deadline)
+        else:
+            reactor.stop()
+
+
+def main():
+    if os.environ.get("DAPHNE_HTTP2") == "0":
+        http.H2_ENABLED = False
+    server.serverFromString = WorkerEndpoint
+    GracefulCommandLineInterface().run(sys.argv[1:])
+
+
+if __name__ == "__main__":
+    main()